@@ -0,0 +1,58 @@
+"""Count content-stream decodes per page during a split run
+
+Usage: python benchmarks/bench_extraction.py [--pages N]
+
+Runs the extraction, page-break and page-range stages against a synthetic
+book and reports how many times each page's text was extracted.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from corpus import book_pages, build_pdf  # noqa: E402
+
+from pypdf import PageObject  # noqa: E402
+from pdf_chapter_splitter.splitter import PDFChapterSplitter  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--chapters', type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = build_pdf(Path(tmp) / "book.pdf", book_pages(args.pages, args.chapters))
+        splitter = PDFChapterSplitter(str(pdf_path), str(Path(tmp) / "out"))
+
+        decodes = Counter()
+        original = PageObject.extract_text
+
+        def counting_extract_text(page, *a, **kw):
+            decodes[page.page_number] += 1
+            return original(page, *a, **kw)
+
+        PageObject.extract_text = counting_extract_text
+        try:
+            start = time.perf_counter()
+            splitter.extract_text()
+            page_breaks = splitter.get_page_breaks()
+            splitter.find_chapter_pages([(0, "Chapter 1"), (page_breaks[len(page_breaks) // 2], "Chapter 2")])
+            elapsed = time.perf_counter() - start
+        finally:
+            PageObject.extract_text = original
+            splitter.document.close()
+
+    print(f"pages:               {args.pages}")
+    print(f"extract_text calls:  {sum(decodes.values())}")
+    print(f"max decodes/page:    {max(decodes.values())}")
+    print(f"elapsed:             {elapsed:.3f}s ({args.pages / elapsed:.1f} pages/s)")
+    return 0 if max(decodes.values()) == 1 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Compare buffered file reads with memory-mapped input on a full split
+
+Usage: python benchmarks/bench_mmap.py [--pages N] [--jobs N] [--repeat N]
+
+Splits a synthetic book once per input backend, each run in a fresh
+interpreter so peak RSS is not carried over between backends, and reports
+wall time plus the peak RSS of the main process and of its extraction
+workers.  Mapped pages of the source count towards RSS but are shared page
+cache, so the worker figures show how much of the file each worker touches
+rather than private copies of it.  Needs the Unix resource module.
+"""
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from corpus import CorpusSpec  # noqa: E402
+
+from pdf_chapter_splitter.metrics import peak_rss_bytes, workers_peak_rss_bytes  # noqa: E402
+from pdf_chapter_splitter.splitter import split_pdf_chapters  # noqa: E402
+
+BACKENDS = ("file", "mmap")
+
+
+def run_child(pdf_path: str, backend: str, jobs: int) -> dict:
+    """Split once with one backend; runs inside the child interpreter"""
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        split_pdf_chapters(pdf_path, tmp, detection="text", jobs=jobs, use_mmap=backend == "mmap")
+        seconds = time.perf_counter() - start
+    workers_peak = workers_peak_rss_bytes() if jobs > 1 else None
+    return {"seconds": seconds, "peak_rss": peak_rss_bytes(), "workers_peak_rss": workers_peak}
+
+
+def measure(pdf_path: Path, backend: str, jobs: int) -> dict:
+    output = subprocess.run([sys.executable, __file__, "--child", backend, "--jobs", str(jobs), str(pdf_path)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def megabytes(size) -> str:
+    return "-" if size is None else f"{size / 2**20:.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--chapters', type=int, default=12)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--child', choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument('pdf', nargs='?', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.pdf, args.child, args.jobs)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = CorpusSpec(args.pages, args.chapters, "en", False).build(Path(tmp))
+        print(f"book: {args.pages} pages, {megabytes(pdf_path.stat().st_size)}, jobs {args.jobs}")
+        print(f"{'backend':<8} {'wall (best)':>12} {'peak RSS':>12} {'worker RSS':>12}")
+        for backend in BACKENDS:
+            runs = [measure(pdf_path, backend, args.jobs) for _ in range(args.repeat)]
+            best = min(run["seconds"] for run in runs)
+            peak = max(run["peak_rss"] or 0 for run in runs) or None
+            workers = max(run["workers_peak_rss"] or 0 for run in runs) or None
+            print(f"{backend:<8} {best:>11.3f}s {megabytes(peak):>12} {megabytes(workers):>12}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
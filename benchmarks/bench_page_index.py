@@ -0,0 +1,82 @@
+"""Scaling benchmark of line-to-page mapping in find_chapter_pages
+
+Usage: python benchmarks/bench_page_index.py [--pages N] [--boundaries N]
+
+Compares the original linear scan over page_breaks (two scans per chapter)
+with LinePageIndex on a synthetic document of 10k pages and 1k boundaries.
+"""
+import argparse
+import contextlib
+import io
+import random
+import tempfile
+import time
+
+from pdf_chapter_splitter.document import ExtractedText, LinePageIndex
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+
+
+def linear_chapter_pages(page_breaks, chapter_boundaries):
+    """The original O(chapters x pages) mapping, kept for comparison"""
+    def scan(line_num):
+        page = 0
+        for j, page_break in enumerate(page_breaks):
+            if line_num >= page_break:
+                page = j
+            else:
+                break
+        return page
+
+    pages = []
+    for i, (line_num, title) in enumerate(chapter_boundaries):
+        start_page = max(0, scan(line_num) - 1)
+        if i + 1 < len(chapter_boundaries):
+            end_page = max(start_page, scan(chapter_boundaries[i + 1][0]) - 2)
+        else:
+            end_page = len(page_breaks) - 2
+        pages.append((start_page, end_page, title))
+    return pages
+
+
+def timed(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=10_000)
+    parser.add_argument('--boundaries', type=int, default=1_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = ['\n'.join(f"line {n}" for n in range(rng.randint(20, 60))) for _ in range(args.pages)]
+    extracted = ExtractedText.from_pages(pages)
+    total_lines = extracted.page_breaks[-1]
+    boundaries = [(line, f"Section {i}") for i, line in
+                  enumerate(sorted(rng.sample(range(total_lines), args.boundaries)))]
+
+    linear_time, linear_result = timed(lambda: linear_chapter_pages(extracted.page_breaks, boundaries), repeat=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        splitter = PDFChapterSplitter(f"{tmp}/benchmark.pdf", output_dir=tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            indexed_time, indexed_result = timed(lambda: splitter.find_chapter_pages(boundaries, extracted))
+
+    index = LinePageIndex(extracted.page_breaks)
+    lines = [line for line, _ in boundaries]
+    lookup_time, _ = timed(lambda: [index.page_of_line(line) for line in lines])
+
+    assert indexed_result == linear_result
+    print(f"pages={args.pages} boundaries={args.boundaries} lines={total_lines}")
+    print(f"linear scan:              {linear_time * 1000:10.2f} ms")
+    print(f"find_chapter_pages:       {indexed_time * 1000:10.2f} ms ({linear_time / indexed_time:,.0f}x faster)")
+    print(f"binary search per line:   {lookup_time * 1000:10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
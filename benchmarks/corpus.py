@@ -0,0 +1,80 @@
+"""Synthetic PDF corpus for benchmarks
+
+Books are generated offline with the test suite's PDF builder
+(tests/pdf_builder.py): every page is a plain text content stream, chapter
+headings are English ("Chapter N Title") or Japanese ("第N章 タイトル"), and
+an outline pointing at each chapter can be added.
+"""
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tests.pdf_builder import build_pdf  # noqa: E402,F401
+
+KANJI_NUMERALS = ["一", "二", "三", "四", "五", "六", "七", "八", "九", "十"]
+
+
+def _kanji(number: int) -> str:
+    tens, ones = divmod(number, 10)
+    prefix = "" if tens == 0 else ("十" if tens == 1 else KANJI_NUMERALS[tens - 1] + "十")
+    return prefix + (KANJI_NUMERALS[ones - 1] if ones else "")
+
+
+def chapter_start_pages(page_count: int, chapter_count: int) -> List[int]:
+    """Evenly spaced chapter start pages, leaving the first page as front matter"""
+    chapter_count = max(1, min(chapter_count, page_count - 1))
+    spacing = (page_count - 1) / chapter_count
+    return [1 + int(i * spacing) for i in range(chapter_count)]
+
+
+def book_pages(page_count: int, chapter_count: int, lines_per_page: int = 40,
+               language: str = "en") -> List[str]:
+    """Page texts of a book with evenly spaced chapter headings"""
+    starts = {page: i + 1 for i, page in enumerate(chapter_start_pages(page_count, chapter_count))}
+    pages = []
+    for page in range(page_count):
+        lines = []
+        if page in starts:
+            lines.append(chapter_heading(starts[page], language))
+        while len(lines) < lines_per_page:
+            if language == "ja":
+                lines.append(f"合成された本文の{len(lines)}行目です。ページ{page + 1}の内容が続きます。")
+            else:
+                lines.append(f"Body text line {len(lines)} on page {page + 1} of the synthetic book.")
+        pages.append('\n'.join(lines))
+    return pages
+
+
+def chapter_heading(number: int, language: str) -> str:
+    if language == "ja":
+        return f"第{_kanji(number)}章 合成データの解析手法"
+    return f"Chapter {number} Synthetic Heading"
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """One synthetic book of the benchmark corpus"""
+    pages: int
+    chapters: int = 12
+    language: str = "en"
+    outline: bool = False
+    lines_per_page: int = 40
+
+    @property
+    def name(self) -> str:
+        return f"{self.language}-{self.pages}p-{self.chapters}c{'-outline' if self.outline else ''}"
+
+    def build(self, directory: Path) -> Path:
+        """Generate the book in directory, reusing an existing file"""
+        path = Path(directory) / f"{self.name}.pdf"
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pages = book_pages(self.pages, self.chapters, self.lines_per_page, self.language)
+        outline = None
+        if self.outline:
+            outline = [(chapter_heading(i + 1, self.language), page)
+                       for i, page in enumerate(chapter_start_pages(self.pages, self.chapters))]
+        return build_pdf(path, pages, outline=outline)
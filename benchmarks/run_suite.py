@@ -0,0 +1,163 @@
+"""Reproducible benchmark suite over a synthetic PDF corpus
+
+Usage:
+    python benchmarks/run_suite.py [--pages 10 100 1000] [--languages en ja]
+                                   [--outline no yes] [--output results.json]
+                                   [--baseline benchmarks/baseline.json] [--save-baseline]
+
+For every corpus book this times extract_text, find_chapter_boundaries,
+find_chapter_pages and an end-to-end split_pdf_chapters run (best of
+--repeat runs), writes the results as JSON and compares them with a stored
+baseline.  Generated books are kept in --corpus-dir and reused.
+
+The committed baseline.json holds the default suite as recorded on the
+machine named in its "environment" entry; timings from other machines are
+only roughly comparable, so re-record it with --save-baseline before
+gating on --fail-on-regression elsewhere.  Without a baseline the comparison
+is skipped with a notice, and --fail-on-regression exits with status 2.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from corpus import CorpusSpec  # noqa: E402
+
+import pypdf  # noqa: E402
+from pdf_chapter_splitter.splitter import PDFChapterSplitter, split_pdf_chapters  # noqa: E402
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_CORPUS_DIR = BENCHMARK_DIR / ".corpus"
+
+
+def best_of(repeat, func):
+    """Fastest wall time of several runs, plus the last result"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_book(pdf_path: Path, repeat: int) -> dict:
+    """Time each pipeline stage on one book"""
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        def fresh_splitter():
+            return PDFChapterSplitter(str(pdf_path), tmp, detection="text")
+
+        def extract():
+            splitter = fresh_splitter()
+            try:
+                return splitter, splitter.extract_pages()
+            finally:
+                splitter.document.close()
+
+        timings["extract_text"], (splitter, extracted) = best_of(repeat, extract)
+        timings["find_chapter_boundaries"], boundaries = best_of(
+            repeat, lambda: splitter.find_chapter_boundaries(extracted))
+        timings["find_chapter_pages"], _ = best_of(
+            repeat, lambda: splitter.find_chapter_pages(boundaries, extracted))
+
+        def end_to_end():
+            output_dir = Path(tempfile.mkdtemp(dir=tmp))
+            return split_pdf_chapters(str(pdf_path), str(output_dir))
+
+        timings["split_pdf_chapters"], output_files = best_of(repeat, end_to_end)
+    return {"timings": timings, "chapters_detected": len(boundaries), "output_files": len(output_files)}
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pypdf": pypdf.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print current vs baseline timings; returns the regressions found"""
+    baseline_books = {book["corpus"]: book for book in baseline.get("results", [])}
+    regressions = []
+    if baseline.get("environment") != results["environment"]:
+        print(f"\nWarning: baseline was recorded on {baseline.get('environment')}; timings may not be comparable.")
+    print(f"\n{'corpus':<28} {'benchmark':<24} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for book in results["results"]:
+        previous = baseline_books.get(book["corpus"])
+        if previous is None:
+            continue
+        for name, seconds in book["timings"].items():
+            before = previous["timings"].get(name)
+            if not before:
+                continue
+            ratio = seconds / before
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions.append((book["corpus"], name, ratio))
+            print(f"{book['corpus']:<28} {name:<24} {before:>9.3f}s {seconds:>9.3f}s {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Page counts of the generated books (10 to 10000)')
+    parser.add_argument('--chapters', type=int, default=12)
+    parser.add_argument('--languages', nargs='+', choices=['en', 'ja'], default=['en', 'ja'])
+    parser.add_argument('--outline', nargs='+', choices=['no', 'yes'], default=['no', 'yes'],
+                        help='Generate books without and/or with an outline')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--corpus-dir', type=Path, default=DEFAULT_CORPUS_DIR)
+    parser.add_argument('--output', type=Path, default=Path('bench_results.json'))
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Slowdown ratio reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    if any(not 10 <= pages <= 10000 for pages in args.pages):
+        parser.error("--pages values must be between 10 and 10000")
+
+    specs = [CorpusSpec(pages, args.chapters, language, outline == 'yes')
+             for pages in args.pages for language in args.languages for outline in args.outline]
+    results = {"environment": environment(), "results": []}
+    for spec in specs:
+        pdf_path = spec.build(args.corpus_dir)
+        book = {"corpus": spec.name, "pages": spec.pages, "language": spec.language,
+                "outline": spec.outline, **bench_book(pdf_path, args.repeat)}
+        results["results"].append(book)
+        timings = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in book["timings"].items())
+        print(f"{spec.name:<28} {timings}")
+
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to '{args.output}'.")
+
+    regressions = []
+    if args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    elif not args.save_baseline:
+        print(f"\nNo baseline found at '{args.baseline}'; nothing to compare against "
+              "(record one with --save-baseline).")
+        if args.fail_on_regression:
+            return 2
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline saved to '{args.baseline}'.")
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,10 @@
-from .splitter import PDFChapterSplitter, split_pdf_chapters
+from .aio import aiter_pdf_chapter_buffers, split_pdf_to_buffers_async
+from .splitter import PDFChapterSplitter, iter_pdf_chapter_buffers, split_pdf_chapters, split_pdf_to_buffers
+from .writer import ChapterBuffer
 
 __version__ = "0.1.0"
-__all__ = ["PDFChapterSplitter", "split_pdf_chapters"]
+__all__ = [
+    "PDFChapterSplitter", "split_pdf_chapters",
+    "ChapterBuffer", "split_pdf_to_buffers", "iter_pdf_chapter_buffers",
+    "split_pdf_to_buffers_async", "aiter_pdf_chapter_buffers",
+]
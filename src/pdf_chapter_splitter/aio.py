@@ -0,0 +1,53 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterator, List, Optional
+from .document import PDFSource
+from .splitter import iter_pdf_chapter_buffers, split_pdf_to_buffers
+from .writer import ChapterBuffer
+
+
+async def _readable_source(source: PDFSource) -> PDFSource:
+    """Read a binary stream into bytes off the event loop (paths and bytes pass through)"""
+    if hasattr(source, "read"):
+        return await asyncio.to_thread(source.read)
+    return source
+
+
+async def split_pdf_to_buffers_async(source: PDFSource, executor: Optional[Executor] = None,
+                                     **options) -> List[ChapterBuffer]:
+    """Split a PDF into in-memory chapters without blocking the event loop
+
+    The whole split runs in ``executor`` (the loop's default thread pool when
+    None).  Pass a ProcessPoolExecutor to run CPU-bound splits truly in
+    parallel; the source then travels to the worker as bytes.
+    """
+    source = await _readable_source(source)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _split_with_options, source, options)
+
+
+def _split_with_options(source: PDFSource, options: dict) -> List[ChapterBuffer]:
+    """Module-level so that process pools can pickle it"""
+    return split_pdf_to_buffers(source, **options)
+
+
+async def aiter_pdf_chapter_buffers(source: PDFSource, executor: Optional[Executor] = None,
+                                    **options) -> AsyncIterator[ChapterBuffer]:
+    """Yield in-memory chapters as they are rendered without blocking the event loop
+
+    Each step of the split (detection, then one chapter at a time) runs in
+    ``executor``, which must be thread based (the loop's default pool when
+    None).
+    """
+    source = await _readable_source(source)
+    loop = asyncio.get_running_loop()
+    chapters = iter_pdf_chapter_buffers(source, **options)
+    finished = object()
+    try:
+        while True:
+            chapter = await loop.run_in_executor(executor, next, chapters, finished)
+            if chapter is finished:
+                break
+            yield chapter
+    finally:
+        await loop.run_in_executor(executor, chapters.close)
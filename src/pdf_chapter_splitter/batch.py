@@ -0,0 +1,155 @@
+import contextlib
+import csv
+import glob
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from .splitter import PDFChapterSplitter
+
+
+SUMMARY_FILENAME = "batch_summary.csv"
+
+
+@dataclass
+class BookResult:
+    """Outcome of splitting one book in a batch"""
+    pdf_path: str
+    output_dir: str
+    status: str
+    seconds: float
+    page_count: int = 0
+    chapter_count: int = 0
+    # Pages that ran into the extraction time budget
+    slow_pages: int = 0
+    error: str = ""
+
+
+def _is_pdf(path: Path) -> bool:
+    return path.is_file() and path.suffix.lower() == ".pdf"
+
+
+def _read_manifest(manifest_path: Path) -> List[Path]:
+    """Paths listed in a manifest, one per line as plain text or JSONL"""
+    paths = []
+    for line in manifest_path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            line = json.loads(line)["path"]
+        path = Path(line).expanduser()
+        paths.append(path if path.is_absolute() else manifest_path.parent / path)
+    return paths
+
+
+def collect_inputs(source: str) -> List[Path]:
+    """Resolve a directory, glob pattern or manifest file to a list of PDFs"""
+    path = Path(source).expanduser()
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if _is_pdf(p))
+    if path.is_file():
+        if path.suffix.lower() == ".pdf":
+            return [path]
+        return _read_manifest(path)
+    return sorted(Path(p) for p in glob.glob(str(path), recursive=True) if _is_pdf(Path(p)))
+
+
+def schedule(pdf_paths: List[Path]) -> List[Path]:
+    """Order books largest first so the slowest jobs do not form the tail"""
+    def size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+    return sorted(pdf_paths, key=size, reverse=True)
+
+
+def output_dirs(pdf_paths: List[Path], output_root: Path) -> Dict[Path, Path]:
+    """One output directory per book, named after the file stem"""
+    assigned = {}
+    used = set()
+    for pdf_path in pdf_paths:
+        name = pdf_path.stem
+        suffix = 1
+        while name in used:
+            name = f"{pdf_path.stem}_{suffix}"
+            suffix += 1
+        used.add(name)
+        assigned[pdf_path] = output_root / name
+    return assigned
+
+
+def split_book(pdf_path: str, output_dir: str, options: Dict, quiet: bool = True) -> BookResult:
+    """Split one book, capturing any failure in the result instead of raising"""
+    started = time.perf_counter()
+    try:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            splitter = PDFChapterSplitter(pdf_path, output_dir, **options)
+            output_files = splitter.split()
+        return BookResult(pdf_path, output_dir, "ok", time.perf_counter() - started,
+                          splitter.document.page_count, len(output_files), len(splitter.document.slow_pages))
+    except Exception as e:
+        return BookResult(pdf_path, output_dir, "failed", time.perf_counter() - started,
+                          error=f"{type(e).__name__}: {e}")
+
+
+def run_batch(pdf_paths: List[Path], output_root: Path, workers: int = 1, options: Optional[Dict] = None,
+              on_result: Optional[Callable[[BookResult], None]] = None) -> List[BookResult]:
+    """Split every book over a process pool; one failing book does not stop the batch"""
+    options = options or {}
+    targets = output_dirs(schedule(pdf_paths), Path(output_root))
+    results = []
+
+    def record(result: BookResult):
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    if workers == 1:
+        for pdf_path, output_dir in targets.items():
+            record(split_book(str(pdf_path), str(output_dir), options))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(split_book, str(pdf_path), str(output_dir), options): (pdf_path, output_dir)
+                   for pdf_path, output_dir in targets.items()}
+        for future in as_completed(futures):
+            pdf_path, output_dir = futures[future]
+            try:
+                record(future.result())
+            except Exception as e:
+                # The worker itself died (e.g. killed or out of memory)
+                record(BookResult(str(pdf_path), str(output_dir), "failed", 0.0, error=f"{type(e).__name__}: {e}"))
+    return results
+
+
+def format_summary(results: List[BookResult]) -> str:
+    """Human-readable table of per-book results"""
+    header = f"{'status':<7} {'seconds':>8} {'pages':>6} {'chapters':>8}  book"
+    rows = [header, "-" * len(header)]
+    for r in sorted(results, key=lambda r: r.pdf_path):
+        line = f"{r.status:<7} {r.seconds:>8.2f} {r.page_count:>6} {r.chapter_count:>8}  {r.pdf_path}"
+        if r.slow_pages:
+            line += f"  ({r.slow_pages} slow pages)"
+        if r.error:
+            line += f"  ({r.error})"
+        rows.append(line)
+    failed = sum(r.status != "ok" for r in results)
+    rows.append(f"{len(results)} books, {failed} failed, "
+                f"{sum(r.page_count for r in results)} pages, {sum(r.seconds for r in results):.2f}s total")
+    return "\n".join(rows)
+
+
+def write_summary(results: List[BookResult], path: Path) -> Path:
+    """Write per-book results as CSV"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(BookResult)])
+        writer.writeheader()
+        for result in sorted(results, key=lambda r: r.pdf_path):
+            writer.writerow(asdict(result))
+    return path
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+import pypdf
+
+
+# Default size cap of the cache directory
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+CACHE_SUFFIX = ".pages.z"
+
+
+def default_cache_dir() -> Path:
+    """Per-user cache location (honours XDG_CACHE_HOME)"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pdf_chapter_splitter"
+
+
+class ExtractionCache:
+    """On-disk cache of extracted page text keyed by PDF content hash
+
+    Each entry is the zlib-compressed JSON list of page texts (null for pages
+    that could not be read).  The key covers the PDF bytes and the pypdf
+    version, since a different extractor may produce different text.  Reads
+    refresh an entry's mtime, and the least recently used entries are evicted
+    once the directory exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(source: Union[str, BinaryIO]) -> str:
+        """Cache key of a PDF file or seekable binary stream"""
+        digest = hashlib.sha256()
+        if isinstance(source, str):
+            with open(source, 'rb') as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        else:
+            position = source.tell()
+            source.seek(0)
+            for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                digest.update(chunk)
+            source.seek(position)
+        digest.update(f"pypdf-{pypdf.__version__}".encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[List[Optional[str]]]:
+        """Cached page texts, or None on a miss"""
+        path = self._entry_path(key)
+        try:
+            pages = json.loads(zlib.decompress(path.read_bytes()))
+            os.utime(path)
+        except (OSError, ValueError, zlib.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pages
+
+    def put(self, key: str, pages: List[Optional[str]]):
+        """Store page texts, then evict old entries beyond the size cap"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(json.dumps(pages, ensure_ascii=False).encode('utf-8'))
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, self._entry_path(key))
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -1,18 +1,154 @@
 import click
 from pathlib import Path
-from .splitter import split_pdf_chapters
+from .batch import SUMMARY_FILENAME, collect_inputs, format_summary, run_batch, write_summary
+from .cache import DEFAULT_CACHE_MAX_BYTES, default_cache_dir
+from .document import DEFAULT_HEADER_BAND
+from .matcher import DEFAULT_CHAPTER_RANGE
+from .plan import MANIFEST_FILENAME, SplitPlan, materialize as materialize_plan
+from .server import DEFAULT_HOST, DEFAULT_JOB_TIMEOUT, DEFAULT_PORT, DEFAULT_QUEUE_SIZE, serve as run_server
+from .splitter import DETECTION_MODES, PDFChapterSplitter
 
 
-@click.command()
+class DefaultCommandGroup(click.Group):
+    """Group that runs its default command when no subcommand is named
+
+    Keeps ``pdf-chapter-splitter input.pdf`` working alongside subcommands.
+    """
+
+    def __init__(self, *args, default_command: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup, default_command='split')
+def main():
+    """Split PDF files by chapters.
+    
+    Run `pdf-chapter-splitter PDF_FILE` to split a single book, or a
+    subcommand such as `batch` for many books.
+    """
+
+
+class ChapterRangeType(click.ParamType):
+    """Chapter number range written as MIN-MAX"""
+    name = 'MIN-MAX'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        try:
+            first, last = (int(part) for part in value.split('-'))
+        except ValueError:
+            self.fail(f"'{value}' is not a range such as 1-30", param, ctx)
+        if first > last:
+            self.fail(f"'{value}' starts after it ends", param, ctx)
+        return first, last
+
+
+class ChapterSelectionType(click.ParamType):
+    """Chapter file numbers written as a list such as 1,3-5"""
+    name = 'LIST'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, set):
+            return value
+        indices = set()
+        try:
+            for part in value.split(','):
+                first, _, last = part.strip().partition('-')
+                indices.update(range(int(first), int(last or first) + 1))
+        except ValueError:
+            self.fail(f"'{value}' is not a list such as 1,3-5", param, ctx)
+        return indices
+
+
+CHAPTER_RANGE_OPTION = click.option(
+    '--chapter-range', type=ChapterRangeType(), default='-'.join(map(str, DEFAULT_CHAPTER_RANGE)),
+    show_default=True, help='Chapter numbers accepted by text detection')
+
+MMAP_OPTION = click.option(
+    '--mmap', 'use_mmap', is_flag=True,
+    help='Read the source PDF through a read-only memory map shared with worker processes')
+
+
+def header_options(command):
+    """Header-band detection options shared by split and batch"""
+    command = click.option('--rank-by-font-size', is_flag=True,
+                           help='With header detection, prefer the largest heading of each chapter')(command)
+    command = click.option('--header-band', type=click.FloatRange(0, 1, min_open=True), default=DEFAULT_HEADER_BAND,
+                           show_default=True, help='Fraction of the page height read by header detection')(command)
+    return command
+
+
+def budget_options(command):
+    """Extraction time budget options shared by split, batch and serve"""
+    command = click.option('--document-timeout', type=click.FloatRange(0, min_open=True),
+                           help='Seconds of text extraction allowed per book; later pages are skipped')(command)
+    command = click.option('--page-timeout', type=click.FloatRange(0, min_open=True),
+                           help='Seconds a single page may take to extract before it is recorded as empty')(command)
+    return command
+
+
+def cache_options(command):
+    """Extraction cache options shared by split and batch"""
+    command = click.option('--cache-size', type=click.IntRange(min=1), default=DEFAULT_CACHE_MAX_BYTES // 2**20,
+                           show_default=True, help='Extraction cache size cap in MB')(command)
+    command = click.option('--no-cache', is_flag=True, help='Do not read or write the extraction cache')(command)
+    command = click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path),
+                           default=default_cache_dir, show_default='~/.cache/pdf_chapter_splitter',
+                           help='Directory of the extracted page text cache')(command)
+    return command
+
+
+def cache_settings(cache_dir: Path, no_cache: bool, cache_size: int) -> dict:
+    return {'cache_dir': None if no_cache else str(cache_dir), 'cache_max_bytes': cache_size * 2**20}
+
+
+@main.command()
 @click.argument('pdf_file', type=click.Path(exists=True, path_type=Path))
 @click.option('--output-dir', '-o', type=click.Path(path_type=Path), 
               help='Output directory (if not specified, output folder in same directory as input file)')
+@click.option('--detection', type=click.Choice(DETECTION_MODES), default='auto', show_default=True,
+              help='Chapter detection: outline bookmarks, table of contents, headings in the top '
+                   'band of each page, full text headings, or outline/toc/text in turn (auto)')
+@click.option('--jobs', '-j', type=click.IntRange(min=0), default=1, show_default=True,
+              help='Worker processes for text extraction (0 uses every CPU)')
+@click.option('--write-workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Threads writing chapter files concurrently')
+@CHAPTER_RANGE_OPTION
+@header_options
+@click.option('--streaming', is_flag=True,
+              help='Detect chapters page by page and write each one as soon as it ends (low memory)')
+@click.option('--incremental', is_flag=True,
+              help='Only rewrite chapter files whose page range or source pages changed since the last run')
+@click.option('--optimize', is_flag=True,
+              help='Shrink chapter files: prune unused resources, compress content streams, merge identical objects')
+@click.option('--measure-savings', is_flag=True,
+              help='With --optimize, also serialize each chapter unoptimized to report the bytes saved (slower)')
+@click.option('--plan', 'plan_only', is_flag=True,
+              help=f'Write the chapter page ranges to {MANIFEST_FILENAME} instead of splitting the PDF')
+@MMAP_OPTION
+@budget_options
+@cache_options
+@click.option('--metrics-json', type=click.Path(dir_okay=False, path_type=Path),
+              help='Write per-stage timings, CPU, peak RSS and throughput as JSON')
+@click.option('--profile-dir', type=click.Path(file_okay=False, path_type=Path),
+              help='Dump a cProfile file for each stage into this directory')
 @click.option('--verbose', '-v', is_flag=True, help='Display detailed information')
-def main(pdf_file: Path, output_dir: Path, verbose: bool):
+def split(pdf_file: Path, output_dir: Path, detection: str, jobs: int, write_workers: int,
+          chapter_range: tuple, header_band: float, rank_by_font_size: bool, streaming: bool, incremental: bool,
+          optimize: bool, measure_savings: bool, plan_only: bool, use_mmap: bool, page_timeout: float, document_timeout: float,
+          cache_dir: Path, no_cache: bool, cache_size: int, metrics_json: Path, profile_dir: Path, verbose: bool):
     """Split PDF file by chapters.
     
     PDF_FILE: Path to the PDF file to split
     """
+    splitter = None
     try:
         if verbose:
             click.echo(f"Input file: {pdf_file}")
@@ -20,11 +156,35 @@ def main(pdf_file: Path, output_dir: Path, verbose: bool):
                 click.echo(f"Output directory: {output_dir}")
         
         # Split PDF
-        output_files = split_pdf_chapters(str(pdf_file), str(output_dir) if output_dir else None)
+        splitter = PDFChapterSplitter(str(pdf_file), str(output_dir) if output_dir else None,
+                                      detection=detection, jobs=jobs, write_workers=write_workers,
+                                      chapter_range=chapter_range, streaming=streaming,
+                                      header_band=header_band, rank_by_font_size=rank_by_font_size,
+                                      incremental=incremental, optimize=optimize,
+                                      measure_savings=measure_savings, use_mmap=use_mmap,
+                                      page_timeout=page_timeout, document_timeout=document_timeout,
+                                      profile_dir=str(profile_dir) if profile_dir else None,
+                                      **cache_settings(cache_dir, no_cache, cache_size))
+        if plan_only:
+            plan = splitter.plan()
+            manifest_path = plan.write_json(splitter.output_dir / MANIFEST_FILENAME)
+            click.echo(f"\n✓ Planned {len(plan.chapters)} chapters ({plan.detection_method}): {manifest_path}")
+            return
+        
+        output_files = splitter.split()
         
         click.echo(f"\n✓ Splitting complete! {len(output_files)} files generated:")
+        skipped = set(splitter.skipped_files)
         for output_file in output_files:
-            click.echo(f"  - {output_file}")
+            click.echo(f"  - {output_file}{' (unchanged)' if output_file in skipped else ''}")
+        if splitter.document.slow_pages:
+            click.echo("Slow pages:")
+            for page in splitter.document.slow_pages:
+                click.echo(f"  - {page.describe()}")
+        
+        if verbose:
+            for stage in splitter.metrics.stages:
+                click.echo(f"  {stage.name:<20} {stage.wall_seconds:8.3f}s wall {stage.cpu_seconds:8.3f}s cpu")
             
     except FileNotFoundError:
         click.echo(f"Error: File '{pdf_file}' not found.", err=True)
@@ -32,7 +192,137 @@ def main(pdf_file: Path, output_dir: Path, verbose: bool):
     except Exception as e:
         click.echo(f"Error: {str(e)}", err=True)
         exit(1)
+    finally:
+        # Metrics are written for failed runs too
+        if metrics_json and splitter is not None:
+            splitter.metrics.write_json(metrics_json)
+
+
+@main.command()
+@click.argument('source')
+@click.option('--output-dir', '-o', type=click.Path(path_type=Path), default=Path('output'), show_default=True,
+              help='Root directory; each book is split into a subdirectory named after it')
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Books split in parallel')
+@click.option('--detection', type=click.Choice(DETECTION_MODES), default='auto', show_default=True,
+              help='Chapter detection: outline bookmarks, table of contents, headings in the top '
+                   'band of each page, full text headings, or outline/toc/text in turn (auto)')
+@click.option('--write-workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Threads writing chapter files concurrently within each book')
+@CHAPTER_RANGE_OPTION
+@header_options
+@click.option('--incremental', is_flag=True,
+              help='Only rewrite chapter files whose page range or source pages changed since the last run')
+@click.option('--optimize', is_flag=True,
+              help='Shrink chapter files: prune unused resources, compress content streams, merge identical objects')
+@MMAP_OPTION
+@budget_options
+@cache_options
+def batch(source: str, output_dir: Path, workers: int, detection: str, write_workers: int,
+          chapter_range: tuple, header_band: float, rank_by_font_size: bool, incremental: bool, optimize: bool,
+          use_mmap: bool, page_timeout: float, document_timeout: float, cache_dir: Path, no_cache: bool, cache_size: int):
+    """Split many PDF files in one run.
+    
+    SOURCE: a directory (searched recursively), a glob pattern such as
+    'books/*.pdf', or a manifest file listing one path per line (plain text
+    or JSONL objects with a "path" key).
+    """
+    pdf_paths = collect_inputs(source)
+    if not pdf_paths:
+        click.echo(f"Error: No PDF files found in '{source}'.", err=True)
+        exit(1)
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    click.echo(f"Splitting {len(pdf_paths)} books with {workers} worker(s)...")
+    
+    def report(result):
+        mark = "✓" if result.status == "ok" else "✗"
+        click.echo(f"  {mark} {result.pdf_path} ({result.seconds:.2f}s)")
+    
+    results = run_batch(pdf_paths, output_dir, workers=workers,
+                        options={'detection': detection, 'write_workers': write_workers,
+                                 'chapter_range': chapter_range, 'header_band': header_band,
+                                 'rank_by_font_size': rank_by_font_size, 'incremental': incremental,
+                                 'optimize': optimize, 'use_mmap': use_mmap, 'page_timeout': page_timeout,
+                                 'document_timeout': document_timeout,
+                                 **cache_settings(cache_dir, no_cache, cache_size)},
+                        on_result=report)
+    
+    summary_path = write_summary(results, output_dir / SUMMARY_FILENAME)
+    click.echo("")
+    click.echo(format_summary(results))
+    click.echo(f"\nSummary written to '{summary_path}'.")
+    if any(result.status != "ok" for result in results):
+        exit(1)
+
+
+@main.command()
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--output-dir', '-o', type=click.Path(path_type=Path),
+              help='Output directory (if not specified, the directory of the manifest)')
+@click.option('--chapters', 'selection', type=ChapterSelectionType(),
+              help='Chapter files to write, e.g. 0,2-4 (default: all)')
+@click.option('--pdf', 'pdf_file', type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help='Source PDF, if it has moved since the plan was made')
+@click.option('--write-workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Threads writing chapter files concurrently')
+@click.option('--optimize', is_flag=True,
+              help='Shrink chapter files: prune unused resources, compress content streams, merge identical objects')
+@MMAP_OPTION
+def materialize(manifest: Path, output_dir: Path, selection: set, pdf_file: Path, write_workers: int,
+                optimize: bool, use_mmap: bool):
+    """Write the chapter files of a plan made with `split --plan`.
+    
+    MANIFEST: Path to the chapters.json manifest
+    """
+    try:
+        plan = SplitPlan.load(manifest)
+        results = materialize_plan(plan, output_dir or manifest.parent, selection,
+                                   str(pdf_file) if pdf_file else None, write_workers, optimize, use_mmap)
+    except Exception as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        exit(1)
+    
+    click.echo(f"✓ {len(results)} files generated:")
+    for result in results:
+        click.echo(f"  - {result.path}")
+
+
+@main.command()
+@click.option('--host', default=DEFAULT_HOST, show_default=True, help='Loopback address to listen on')
+@click.option('--port', '-p', type=click.IntRange(0, 65535), default=DEFAULT_PORT, show_default=True,
+              help='TCP port to listen on')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False, path_type=Path),
+              help='Listen on this Unix domain socket instead of a TCP port')
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Worker processes kept running to split books')
+@click.option('--queue-size', type=click.IntRange(min=0), default=DEFAULT_QUEUE_SIZE, show_default=True,
+              help='Jobs allowed to wait for a worker; further jobs are answered with 503')
+@click.option('--timeout', type=click.FloatRange(0, min_open=True), default=DEFAULT_JOB_TIMEOUT, show_default=True,
+              help='Longest time in seconds a job may run (clients may ask for less)')
+@MMAP_OPTION
+@budget_options
+@cache_options
+@click.option('--verbose', '-v', is_flag=True, help='Log every request')
+def serve(host: str, port: int, socket_path: Path, workers: int, queue_size: int, timeout: float, use_mmap: bool,
+          page_timeout: float, document_timeout: float, cache_dir: Path, no_cache: bool, cache_size: int,
+          verbose: bool):
+    """Run a resident split server with warm worker processes.
+    
+    POST /split with a JSON job {"path": ..., "output_dir": ..., "plan": false,
+    "options": {...}} or with the PDF itself as an application/pdf body
+    (settings in the query string, e.g. ?plan=true). GET /stats reports
+    queue depth and throughput. Jobs read and write files on this machine,
+    so the server only listens on loopback addresses.
+    """
+    try:
+        run_server(host, port, str(socket_path) if socket_path else None, workers, queue_size, timeout,
+                   {'use_mmap': use_mmap, 'page_timeout': page_timeout, 'document_timeout': document_timeout,
+                    **cache_settings(cache_dir, no_cache, cache_size)}, verbose)
+    except ValueError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        exit(1)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,497 @@
+import bisect
+import io
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from pypdf import PdfReader
+from .cache import ExtractionCache
+from .timeouts import JobTimeout, time_limit
+
+
+# A PDF given as a file path, its bytes, or a seekable binary stream
+PDFSource = Union[str, os.PathLike, bytes, BinaryIO]
+
+# Each worker gets several shards so uneven pages still balance out
+SHARDS_PER_JOB = 4
+
+# Fraction of the page height, measured from the top, read by header-band
+# extraction
+DEFAULT_HEADER_BAND = 0.25
+
+
+def open_input(pdf_path: Union[str, os.PathLike], use_mmap: bool = False) -> BinaryIO:
+    """Open a PDF for reading, as a read-only memory map when ``use_mmap`` is set
+
+    A mapping serves reads straight from the page cache instead of through
+    buffered file I/O, and every process mapping the same file shares its
+    physical pages.  Files that cannot be mapped (empty files, pipes) are
+    read normally.
+    """
+    file = open(pdf_path, 'rb')
+    if not use_mmap:
+        return file
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        return file
+    # The mapping holds its own handle on the file
+    file.close()
+    return mapped
+
+
+class _PageTimeout(JobTimeout):
+    """A single page ran past its extraction budget"""
+
+
+@dataclass
+class ExtractionBudget:
+    """Wall time limits on text extraction, per page and per document
+
+    The document clock starts with the first page decoded and is kept as a
+    wall-clock ``deadline`` so that worker processes can share it.  Once it
+    has run out, the remaining pages are skipped.
+    """
+    page_timeout: Optional[float] = None
+    document_timeout: Optional[float] = None
+    deadline: Optional[float] = None
+
+    def __post_init__(self):
+        for name in ("page_timeout", "document_timeout"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be a positive number of seconds")
+
+    def start(self):
+        """Start the document clock if it is not running yet"""
+        if self.document_timeout is not None and self.deadline is None:
+            self.deadline = time.time() + self.document_timeout
+
+    def page_limit(self) -> Optional[float]:
+        """Seconds the next page may take: None for no limit, 0 once the document budget is spent"""
+        if self.document_timeout is None:
+            return self.page_timeout
+        self.start()
+        remaining = max(0.0, self.deadline - time.time())
+        return remaining if self.page_timeout is None else min(self.page_timeout, remaining)
+
+
+@dataclass
+class SlowPage:
+    """A page whose extraction ran into its time limit"""
+    index: int
+    seconds: float
+    # False when the page could not be interrupted (outside the main
+    # thread) and was only measured
+    aborted: bool
+
+    def describe(self) -> str:
+        return f"page {self.index + 1} ({self.seconds:.1f}s{', recorded as empty' if self.aborted else ''})"
+
+
+@dataclass
+class PageOutcome:
+    """Result of decoding one page within an extraction budget
+
+    ``value`` is None when the page could not be read, was aborted, or was
+    skipped because the document budget had run out.
+    """
+    index: int
+    value: Any
+    warning: Optional[str] = None
+    slow: Optional[SlowPage] = None
+    skipped: bool = False
+
+
+def decode_page(index: int, decode: Callable[[], Any], budget: ExtractionBudget) -> PageOutcome:
+    """Run ``decode`` for one page under the budget, turning errors and overruns into an outcome
+
+    A page is interrupted with a SIGALRM timer where possible (the main
+    thread of a process); elsewhere it runs to completion and is only
+    reported as slow.
+    """
+    limit = budget.page_limit()
+    if limit == 0:
+        return PageOutcome(index, None, skipped=True)
+    
+    started = time.perf_counter()
+    try:
+        with time_limit(limit, f"Page {index+1} extraction", _PageTimeout):
+            value = decode()
+    except _PageTimeout:
+        seconds = time.perf_counter() - started
+        return PageOutcome(index, None, f"Warning: Page {index+1} exceeded its {limit:g}s extraction budget "
+                                        f"and was recorded as empty", SlowPage(index, seconds, True))
+    except Exception as e:
+        return PageOutcome(index, None, f"Warning: Error loading page {index+1}: {e}")
+    
+    seconds = time.perf_counter() - started
+    if limit is not None and seconds > limit:
+        return PageOutcome(index, value, f"Warning: Page {index+1} took {seconds:.1f}s to extract "
+                                         f"(budget {limit:g}s)", SlowPage(index, seconds, False))
+    return PageOutcome(index, value)
+
+
+def _extract_page_shard(pdf_path: str, indices: List[int], use_mmap: bool = False,
+                        budget: Optional[ExtractionBudget] = None) -> List[PageOutcome]:
+    """Extract a shard of pages with a reader private to the worker process
+
+    Returns the outcome of each page; its value is the page text, or None
+    with a warning when the page could not be read in time.
+    """
+    budget = budget or ExtractionBudget()
+    with open_input(pdf_path, use_mmap) as file:
+        reader = PdfReader(file, strict=False)
+        return [decode_page(index, lambda: reader.pages[index].extract_text(), budget) for index in indices]
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Number of worker processes to use (0 means one per CPU)"""
+    if jobs < 0:
+        raise ValueError("jobs must be 0 or a positive integer")
+    return jobs or os.cpu_count() or 1
+
+
+class LinePageIndex:
+    """Sorted mapping between document line numbers and pages
+
+    Built from page start offsets (``page_breaks``, whose last entry is the
+    total line count).  Single lookups are binary searches; a sorted batch of
+    lines is resolved in one merge pass.
+    """
+
+    def __init__(self, page_breaks: Sequence[int]):
+        self.page_breaks = list(page_breaks)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_breaks) - 1
+
+    def page_of_line(self, line_num: int) -> int:
+        """Page containing a line (the last page whose start is at or before it)"""
+        return max(0, bisect.bisect_right(self.page_breaks, line_num) - 1)
+
+    def first_line_of_page(self, page: int) -> int:
+        """Line number at which a page starts"""
+        return self.page_breaks[page]
+
+    def line_range(self, page: int) -> Tuple[int, int]:
+        """Half-open range [start, end) of the lines on a page"""
+        return self.page_breaks[page], self.page_breaks[page + 1]
+
+    def pages_of_lines(self, line_nums: Sequence[int]) -> List[int]:
+        """Page of each line; ascending input is resolved in a single pass"""
+        if any(a > b for a, b in zip(line_nums, line_nums[1:])):
+            return [self.page_of_line(line_num) for line_num in line_nums]
+
+        pages = []
+        page = 0
+        last = len(self.page_breaks) - 1
+        for line_num in line_nums:
+            while page < last and self.page_breaks[page + 1] <= line_num:
+                page += 1
+            pages.append(page)
+        return pages
+
+
+@dataclass
+class ExtractedText:
+    """Per-page text of a document plus the line offset of each page
+
+    ``page_breaks[i]`` is the line number at which page ``i`` starts in the
+    concatenated document text; the final entry is the total line count.
+    Pages that could not be read are ``None`` and contribute no lines.
+    """
+    pages: List[Optional[str]]
+    page_breaks: List[int]
+
+    @classmethod
+    def from_pages(cls, pages: List[Optional[str]]) -> "ExtractedText":
+        page_breaks = [0]
+        for page_text in pages:
+            line_count = 0 if page_text is None else page_text.count('\n') + 1
+            page_breaks.append(page_breaks[-1] + line_count)
+        return cls(pages, page_breaks)
+
+    @property
+    def text(self) -> str:
+        """Whole document text, one newline after each readable page"""
+        return "".join(page_text + "\n" for page_text in self.pages if page_text is not None)
+
+    @property
+    def index(self) -> LinePageIndex:
+        """Line/page index over this text"""
+        return LinePageIndex(self.page_breaks)
+
+    def iter_lines(self) -> Iterator[str]:
+        """Lines of the document text without building the joined string"""
+        for page_text in self.pages:
+            if page_text is not None:
+                yield from page_text.split('\n')
+
+
+@dataclass
+class HeaderLine:
+    """A line of text found in the header band of a page"""
+    text: str
+    font_size: float
+
+
+class _BandComplete(Exception):
+    """Raised by the text visitor once the header band has been read"""
+
+
+def _page_y_and_scale(cm: Sequence[float], tm: Sequence[float]) -> Tuple[float, float]:
+    """Page-space baseline y and vertical scale of a text run"""
+    y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+    scale = abs(tm[2] * cm[0] + tm[3] * cm[2]) + abs(tm[2] * cm[1] + tm[3] * cm[3])
+    return y, scale or 1.0
+
+
+class PDFDocument:
+    """Parsed PDF shared by every stage of a split run
+
+    The source file is opened and parsed at most once per session, and the
+    text of each page is extracted at most once.  ``open_count`` records how
+    many times the file had to be opened and parsed, including once per
+    shard when ``jobs`` spreads extraction over worker processes.  With an
+    ``ExtractionCache``, page text of a previously seen file is loaded from
+    disk instead of being extracted.  With ``use_mmap``, the file and every
+    worker's copy of it are read through a shared read-only memory map.
+    ``page_timeout`` and ``document_timeout`` bound extraction time; pages
+    over budget are recorded as empty and listed in ``slow_pages`` and
+    ``budget_skipped_pages``.
+    """
+
+    def __init__(self, source: PDFSource, jobs: int = 1, cache: Optional[ExtractionCache] = None,
+                 use_mmap: bool = False, page_timeout: Optional[float] = None,
+                 document_timeout: Optional[float] = None):
+        # In-memory sources have no path; they are parsed from the stream
+        # and extracted without worker processes
+        self.pdf_path: Optional[Path] = None
+        self._stream: Optional[BinaryIO] = None
+        if isinstance(source, (str, os.PathLike)):
+            self.pdf_path = Path(source)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self._stream = io.BytesIO(source)
+        else:
+            self._stream = source
+        self.name = str(self.pdf_path) if self.pdf_path else "<memory>"
+        self.jobs = resolve_jobs(jobs)
+        self.cache = cache
+        self.use_mmap = use_mmap
+        self.budget = ExtractionBudget(page_timeout, document_timeout)
+        self.slow_pages: List[SlowPage] = []
+        self.budget_skipped_pages: List[int] = []
+        self.open_count = 0
+        self._file: Optional[BinaryIO] = None
+        self._reader: Optional[PdfReader] = None
+        self._page_texts: Dict[int, Optional[str]] = {}
+        self._header_lines: Dict[Tuple[int, float], List[HeaderLine]] = {}
+        self._extracted: Optional[ExtractedText] = None
+        self._page_count: Optional[int] = None
+        # Cache entry is looked up once, on first access to any page text
+        self._cache_checked = False
+        self._cache_key: Optional[str] = None
+
+    @property
+    def reader(self) -> PdfReader:
+        """Parsed reader, opening the file on first use"""
+        if self._reader is None:
+            if self.pdf_path is None:
+                self._reader = PdfReader(self._stream, strict=False)
+            else:
+                self._file = open_input(self.pdf_path, self.use_mmap)
+                try:
+                    self._reader = PdfReader(self._file, strict=False)
+                except Exception:
+                    self._file.close()
+                    self._file = None
+                    raise
+            self.open_count += 1
+        return self._reader
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages in the document"""
+        if self._page_count is None:
+            self._page_count = len(self.reader.pages)
+        return self._page_count
+
+    @property
+    def known_page_count(self) -> Optional[int]:
+        """Page count if already determined, without opening the file"""
+        return self._page_count
+
+    @property
+    def extracted_page_count(self) -> int:
+        """Number of pages whose text is held by this session"""
+        return len(self._page_texts)
+
+    @property
+    def decoded_page_count(self) -> int:
+        """Number of pages decoded in full or as a header band"""
+        return len(set(self._page_texts) | {index for index, _ in self._header_lines})
+
+    def page_text(self, index: int) -> Optional[str]:
+        """Extracted text of a page (None if the page could not be read)"""
+        if index not in self._page_texts:
+            self._ensure_cache()
+        if index not in self._page_texts:
+            self._page_texts[index] = self._extract_page(index)
+        return self._page_texts[index]
+
+    @property
+    def budget_exceeded(self) -> bool:
+        """Whether any page was cut short or skipped by the extraction budget"""
+        return bool(self.budget_skipped_pages) or any(page.aborted for page in self.slow_pages)
+
+    def _extract_page(self, index: int) -> Optional[str]:
+        return self._decode(index, lambda: self.reader.pages[index].extract_text())
+
+    def _decode(self, index: int, decode: Callable[[], Any]) -> Any:
+        return self._record(decode_page(index, decode, self.budget))
+
+    def _record(self, outcome: PageOutcome) -> Any:
+        """Report a page outcome and return its value"""
+        if outcome.warning:
+            print(outcome.warning)
+        if outcome.slow is not None:
+            self.slow_pages.append(outcome.slow)
+        if outcome.skipped:
+            if not self.budget_skipped_pages:
+                print(f"Warning: Document extraction budget of {self.budget.document_timeout:g}s used up; "
+                      f"skipping the remaining pages")
+            self.budget_skipped_pages.append(outcome.index)
+        return outcome.value
+
+    def header_lines(self, index: int, band: float = DEFAULT_HEADER_BAND) -> List[HeaderLine]:
+        """Lines of text in the top ``band`` of a page, top to bottom
+
+        Text runs are filtered by their page-space baseline.  Decoding stops
+        at the first run below the band once text inside it has been seen,
+        so the body of a page drawn in reading order is never decoded.
+        """
+        key = (index, band)
+        if key not in self._header_lines:
+            self._header_lines[key] = self._decode(index, lambda: self._extract_header_lines(index, band)) or []
+        return self._header_lines[key]
+
+    def _extract_header_lines(self, index: int, band: float) -> List[HeaderLine]:
+        try:
+            page = self.reader.pages[index]
+            box = page.mediabox
+            band_bottom = float(box.top) - band * float(box.height)
+        except Exception as e:
+            print(f"Warning: Error loading page {index+1}: {e}")
+            return []
+        
+        # Runs sharing a baseline form one line: rounded y -> [text, font size]
+        lines: Dict[int, list] = {}
+        
+        def visit(text, cm, tm, font_dict, font_size):
+            if not text.strip():
+                return
+            y, scale = _page_y_and_scale(cm, tm)
+            if y < band_bottom:
+                if lines:
+                    raise _BandComplete
+                return
+            line = lines.setdefault(round(y), ["", 0.0])
+            line[0] += text
+            line[1] = max(line[1], (font_size or 0.0) * scale)
+        
+        try:
+            page.extract_text(visitor_text=visit)
+        except _BandComplete:
+            pass
+        except Exception as e:
+            print(f"Warning: Error loading page {index+1}: {e}")
+        return [HeaderLine(' '.join(text.split()), size)
+                for _, (text, size) in sorted(lines.items(), reverse=True)]
+
+    def iter_page_texts(self) -> Iterator[Tuple[int, Optional[str]]]:
+        """Yield (page index, text) lazily without keeping the text
+
+        Pages already extracted in this session, or found in the cache, are
+        served from memory.
+        """
+        self._ensure_cache()
+        for index in range(self.page_count):
+            if index in self._page_texts:
+                yield index, self._page_texts[index]
+            else:
+                yield index, self._extract_page(index)
+
+    def extract_pages(self) -> ExtractedText:
+        """Extract every page in one pass (cached for the session)"""
+        if self._extracted is None:
+            cache_key = self._ensure_cache()
+            missing = [i for i in range(self.page_count) if i not in self._page_texts]
+            if self.jobs > 1 and len(missing) > 1 and self.pdf_path is not None:
+                self._extract_parallel(missing)
+            self._extracted = ExtractedText.from_pages([self.page_text(i) for i in range(self.page_count)])
+            # Pages cut short by the budget are retried next time rather than cached
+            if cache_key is not None and missing and not self.budget_exceeded:
+                try:
+                    self.cache.put(cache_key, self._extracted.pages)
+                except OSError as e:
+                    print(f"Warning: Could not write extraction cache: {e}")
+        return self._extracted
+
+    def _ensure_cache(self) -> Optional[str]:
+        """Load the cache entry on first use; returns the key for storing a miss"""
+        if self.cache is not None and not self._cache_checked:
+            self._cache_checked = True
+            self._cache_key = self._load_from_cache()
+        return self._cache_key
+
+    def _load_from_cache(self) -> Optional[str]:
+        """Fill page texts from the cache; returns the key for storing a miss"""
+        try:
+            key = self.cache.key_for(str(self.pdf_path) if self.pdf_path else self._stream)
+        except OSError as e:
+            print(f"Warning: Could not read extraction cache: {e}")
+            return None
+        pages = self.cache.get(key)
+        if pages is not None:
+            if self._page_count is None:
+                self._page_count = len(pages)
+            if len(pages) == self._page_count:
+                self._page_texts.update(enumerate(pages))
+        return key
+
+    def _extract_parallel(self, indices: List[int]):
+        """Extract pages across a process pool, merging results in page order"""
+        shard_count = min(len(indices), self.jobs * SHARDS_PER_JOB)
+        shard_size = -(-len(indices) // shard_count)
+        shards = [indices[i:i + shard_size] for i in range(0, len(indices), shard_size)]
+        
+        self.budget.start()
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(shards))) as executor:
+            futures = [executor.submit(_extract_page_shard, str(self.pdf_path), shard, self.use_mmap, self.budget)
+                       for shard in shards]
+            # Collect in submission order so warnings print in page order
+            for future in futures:
+                for outcome in future.result():
+                    self._page_texts[outcome.index] = self._record(outcome)
+                self.open_count += 1
+
+    def close(self):
+        """Release the file handle or mapping (page count and extracted text are kept)
+
+        A stream passed in by the caller is left open.
+        """
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._reader = None
+
+    def __enter__(self) -> "PDFDocument":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,157 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+from .writer import ChapterWriteResult
+
+
+STATE_FILENAME = ".chapter_state.json"
+STATE_VERSION = 1
+
+# Back references that would pull the whole page tree into a page's hash
+SKIPPED_KEYS = {"/Parent", "/P"}
+
+
+class PageHasher:
+    """Content hashes of source pages
+
+    A page hash covers the page dictionary and everything it references
+    (content streams, resources, annotations), except back references to
+    the page tree.  Hashes of indirect objects are memoized, so resources
+    shared by many pages are hashed once per reader.
+    """
+
+    def __init__(self, reader: PdfReader):
+        self.reader = reader
+        self._objects: Dict[Tuple[int, int], bytes] = {}
+
+    def page_hash(self, page_num: int) -> str:
+        return hashlib.sha256(self._hash(self.reader.pages[page_num], set())).hexdigest()
+
+    def chapter_fingerprint(self, start_page: int, end_page: int, settings: str = "") -> str:
+        """Fingerprint of a page range: the range, output settings and the hash of each page"""
+        digest = hashlib.sha256(f"{start_page}-{end_page} {settings}".encode())
+        for page_num in range(start_page, end_page + 1):
+            digest.update(self.page_hash(page_num).encode())
+        return digest.hexdigest()
+
+    def _hash(self, obj, resolving: set) -> bytes:
+        if isinstance(obj, IndirectObject):
+            key = (obj.idnum, obj.generation)
+            if key in self._objects:
+                return self._objects[key]
+            if key in resolving:  # Reference cycle
+                return f"ref {key}".encode()
+            resolving.add(key)
+            value = self._hash(obj.get_object(), resolving)
+            resolving.discard(key)
+            self._objects[key] = value
+            return value
+
+        digest = hashlib.sha256(type(obj).__name__.encode())
+        if isinstance(obj, DictionaryObject):
+            for key in sorted(obj):
+                if key in SKIPPED_KEYS:
+                    continue
+                digest.update(str(key).encode())
+                digest.update(self._hash(obj.raw_get(key), resolving))
+            if isinstance(obj, StreamObject):
+                # Raw stream bytes: no need to decode content to compare it
+                digest.update(getattr(obj, "_data", None) or b"")
+        elif isinstance(obj, ArrayObject):
+            for item in obj:
+                digest.update(self._hash(item, resolving))
+        else:
+            digest.update(repr(obj).encode())
+        return digest.digest()
+
+
+@dataclass
+class ChapterState:
+    """What was last written to one output file"""
+    start_page: int
+    end_page: int
+    fingerprint: str
+    bytes_written: int
+
+
+@dataclass
+class IncrementalState:
+    """Sidecar file in the output directory recording each output's fingerprint"""
+    path: Path
+    chapters: Dict[str, ChapterState] = field(default_factory=dict)
+    # Fingerprints computed by partition() for the files about to be written
+    pending: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, output_dir: Path) -> "IncrementalState":
+        """State of output_dir (empty if missing or unreadable)"""
+        path = Path(output_dir) / STATE_FILENAME
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") != STATE_VERSION:
+                return cls(path)
+            return cls(path, {name: ChapterState(**entry) for name, entry in data["chapters"].items()})
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls(path)
+
+    @staticmethod
+    def discard(output_dir: Path):
+        """Forget the state, e.g. after outputs were rewritten by a full split"""
+        (Path(output_dir) / STATE_FILENAME).unlink(missing_ok=True)
+
+    def is_current(self, filename: str, fingerprint: str) -> bool:
+        """Whether filename was written from this fingerprint and is still intact"""
+        previous = self.chapters.get(filename)
+        if previous is None or previous.fingerprint != fingerprint:
+            return False
+        output_path = self.path.parent / filename
+        return output_path.is_file() and output_path.stat().st_size == previous.bytes_written
+
+    def partition(self, reader: PdfReader, jobs: List[Tuple[int, int, str]],
+                  settings: str = "") -> Tuple[List[Tuple[int, int, str]], List[str]]:
+        """Split (start, end, filename) jobs into those to write and unchanged file names
+
+        ``settings`` describes output options that change the written bytes,
+        so toggling them rewrites every file.
+        """
+        hasher = PageHasher(reader)
+        to_write, skipped = [], []
+        self.pending = {}
+        for start_page, end_page, filename in jobs:
+            fingerprint = hasher.chapter_fingerprint(start_page, end_page, settings)
+            if self.is_current(filename, fingerprint):
+                skipped.append(filename)
+            else:
+                self.pending[filename] = fingerprint
+                to_write.append((start_page, end_page, filename))
+        return to_write, skipped
+
+    def record(self, result: ChapterWriteResult):
+        """Remember the fingerprint of a freshly written output"""
+        filename = result.path.name
+        self.chapters[filename] = ChapterState(result.start_page, result.end_page,
+                                               self.pending.pop(filename), result.bytes_written)
+
+    def remove_stale(self, keep: List[str]) -> List[Path]:
+        """Delete outputs recorded in the state but no longer produced"""
+        removed = []
+        for filename in sorted(set(self.chapters) - set(keep)):
+            output_path = self.path.parent / filename
+            if output_path.is_file():
+                output_path.unlink()
+                removed.append(output_path)
+            del self.chapters[filename]
+        return removed
+
+    def save(self):
+        data = {
+            "version": STATE_VERSION,
+            "chapters": {name: vars(entry) for name, entry in sorted(self.chapters.items())},
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
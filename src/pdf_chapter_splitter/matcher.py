@@ -0,0 +1,177 @@
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+# Chapters outside this range are ignored unless configured otherwise
+DEFAULT_CHAPTER_RANGE = (1, 15)
+
+KANJI_DIGITS = {
+    '〇': 0, '零': 0, '一': 1, '二': 2, '三': 3, '四': 4,
+    '五': 5, '六': 6, '七': 7, '八': 8, '九': 9,
+}
+KANJI_UNITS = {'十': 10, '百': 100, '千': 1000}
+
+ROMAN_VALUES = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
+ROMAN_PATTERN = re.compile(r'^M{0,3}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})$')
+
+_DIGITS = '0-9０-９'
+_KANJI = ''.join(KANJI_DIGITS) + ''.join(KANJI_UNITS)
+
+# One alternation per supported heading format; exactly one number group and
+# one title group take part in any match
+HEADING_PATTERN = re.compile(
+    rf'^(?:'
+    rf'第?\s*(?P<japanese>[{_DIGITS}{_KANJI}]+)\s*章\s*(?P<japanese_title>.*)'
+    rf'|(?i:chapter)\s+(?P<english>[{_DIGITS}]+|[IVXLCDMivxlcdm]+)\b[\s.:\-–—]*(?P<english_title>.*)'
+    rf'|(?P<numbered>[{_DIGITS}]{{1,3}})\.\s+(?P<numbered_title>\S.*)'
+    rf'|(?P<bare>[{_DIGITS}]{{1,3}})\s+(?P<bare_title>[^{_DIGITS}\s.].*)'
+    rf')$'
+)
+HEADING_KINDS = ('japanese', 'english', 'numbered', 'bare')
+# Kinds that name a chapter outright; "N. Title" and "N Title" also match
+# numbered lists and ordinary sentences, so they only count in documents
+# without any of these
+EXPLICIT_HEADING_KINDS = ('japanese', 'english')
+
+# Table of contents entry: "N章 Title ……… page" or "Chapter N Title .... page"
+TOC_ENTRY_PATTERN = re.compile(
+    rf'^(?:第?\s*(?P<japanese>[{_DIGITS}{_KANJI}]+)\s*章'
+    rf'|(?i:chapter)\s+(?P<english>[{_DIGITS}]+|[IVXLCDMivxlcdm]+)\b[.:]?)'
+    rf'\s*(?P<title>.+?)\s*[ʜ…\.]*\s*(?P<page>[{_DIGITS}]+)\s*$'
+)
+
+# Page header / table of contents indicators
+LEADER_PATTERN = re.compile(r'[ʜ…]|\.{3,}')
+TRAILING_PAGE_NUMBER_PATTERN = re.compile(r'\s+[0-9]+\s*$')
+CHAPTER_ONLY_PATTERN = re.compile(r'^\s*[0-9]+章\s*$')
+
+
+def kanji_to_int(num_str: str) -> Optional[int]:
+    """Convert a kanji numeral such as 十二, 二十三 or 百五 to an int"""
+    if not num_str or any(ch not in KANJI_DIGITS and ch not in KANJI_UNITS for ch in num_str):
+        return None
+
+    # Positional form without units, e.g. 一二 or 二〇
+    if not any(ch in KANJI_UNITS for ch in num_str):
+        value = 0
+        for ch in num_str:
+            value = value * 10 + KANJI_DIGITS[ch]
+        return value
+
+    total = 0
+    current = None
+    last_unit = None
+    for ch in num_str:
+        if ch in KANJI_DIGITS:
+            if current is not None:
+                return None
+            current = KANJI_DIGITS[ch]
+        else:
+            unit = KANJI_UNITS[ch]
+            # Units must appear in decreasing order (千 → 百 → 十)
+            if last_unit is not None and unit >= last_unit:
+                return None
+            total += (1 if current is None else current) * unit
+            current = None
+            last_unit = unit
+    return total + (current or 0)
+
+
+def roman_to_int(num_str: str) -> Optional[int]:
+    """Convert a Roman numeral (either case) to an int"""
+    num_str = num_str.upper()
+    if not num_str or not ROMAN_PATTERN.match(num_str):
+        return None
+
+    value = 0
+    for ch, next_ch in zip(num_str, num_str[1:] + ' '):
+        digit = ROMAN_VALUES[ch]
+        value += -digit if digit < ROMAN_VALUES.get(next_ch, 0) else digit
+    return value
+
+
+def convert_number(num_str: str) -> Optional[int]:
+    """Convert an Arabic (incl. full-width), kanji or Roman chapter number"""
+    if num_str.isdigit():
+        return int(num_str)
+    number = kanji_to_int(num_str)
+    if number is None:
+        number = roman_to_int(num_str)
+    return number
+
+
+@dataclass
+class HeadingMatch:
+    """A line recognised as a chapter heading"""
+    number: int
+    title: str
+    kind: str
+
+    @property
+    def explicit(self) -> bool:
+        """Whether the heading is spelled out as a chapter (第N章, Chapter N)"""
+        return self.kind in EXPLICIT_HEADING_KINDS
+
+
+class HeadingMatcher:
+    """Table-driven chapter heading recogniser built on one precompiled pattern
+
+    Supported formats: 第N章 / N章 (Arabic or kanji numerals), Chapter N
+    (Arabic or Roman numerals), "N. Title" and "N Title".  The last two are
+    weak matches (see ``HeadingMatch.explicit``).
+    """
+
+    def __init__(self, chapter_range: Tuple[int, int] = DEFAULT_CHAPTER_RANGE):
+        first, last = chapter_range
+        if first > last:
+            raise ValueError(f"Invalid chapter range {first}-{last}")
+        self.chapter_range = (first, last)
+
+    def match(self, line: str) -> Optional[HeadingMatch]:
+        """Parse a stripped line as a heading within the chapter range"""
+        m = HEADING_PATTERN.match(line)
+        if not m:
+            return None
+
+        for kind in HEADING_KINDS:
+            num_str = m.group(kind)
+            if num_str is not None:
+                break
+        number = convert_number(num_str)
+        if number is None:
+            return None
+
+        first, last = self.chapter_range
+        if not first <= number <= last:
+            return None
+        return HeadingMatch(number, m.group(f"{kind}_title").strip(), kind)
+
+    def match_toc_entry(self, line: str) -> Optional[Tuple[int, str, int]]:
+        """Parse a stripped table of contents line as (chapter, title, printed page)"""
+        m = TOC_ENTRY_PATTERN.match(line)
+        if not m:
+            return None
+
+        number = convert_number(m.group('japanese') or m.group('english'))
+        first, last = self.chapter_range
+        if number is None or not first <= number <= last:
+            return None
+        return number, m.group('title').strip(), int(m.group('page'))
+
+    @staticmethod
+    def is_obviously_header(line: str) -> bool:
+        """Determine if obviously a page header or table of contents entry"""
+        # 1. Contains line characters (table of contents or decoration)
+        if LEADER_PATTERN.search(line):
+            return True
+
+        # 2. Has page number-like digits at the end
+        if TRAILING_PAGE_NUMBER_PATTERN.search(line):
+            return True
+
+        # 3. Exclude lines with only chapter numbers
+        if CHAPTER_ONLY_PATTERN.match(line):
+            return True
+
+        return False
@@ -0,0 +1,156 @@
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _max_rss(who: int) -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far (None if unknown)"""
+    return _max_rss(resource.RUSAGE_SELF) if resource else None
+
+
+def workers_peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of the largest worker process that has exited (None if unknown)"""
+    return _max_rss(resource.RUSAGE_CHILDREN) if resource else None
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process right now (None where /proc is missing)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def cpu_seconds() -> float:
+    """CPU time of this process and its finished worker processes"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+@dataclass
+class StageMetrics:
+    """Timing and resource use of one stage of a split run
+
+    The OS only tracks a high-water mark of resident memory per process, so
+    a stage records the RSS it started at, the process high-water mark when
+    it ended and how far it raised that mark (0 when the stage stayed below
+    an earlier peak).  ``workers_max_rss_bytes`` is set when a worker process
+    that exited during the stage was the largest one so far.  CPU time
+    covers this process and its exited workers.
+    """
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    pages: int = 0
+    output_bytes: int = 0
+    extra: Dict[str, object] = field(default_factory=dict)
+    rss_start_bytes: Optional[int] = None
+    max_rss_bytes: Optional[int] = None
+    max_rss_growth_bytes: Optional[int] = None
+    workers_max_rss_bytes: Optional[int] = None
+
+    @property
+    def pages_per_second(self) -> Optional[float]:
+        if not self.pages or self.wall_seconds <= 0:
+            return None
+        return self.pages / self.wall_seconds
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["pages_per_second"] = self.pages_per_second
+        return data
+
+
+class RunMetrics:
+    """Collects StageMetrics for one split run
+
+    ``on_stage`` is called with each stage as it finishes.  With
+    ``profile_dir``, every stage measured through ``stage()`` is also run
+    under cProfile and dumped to ``NN-<stage>.prof`` in that directory.
+    """
+
+    def __init__(self, on_stage: Optional[Callable[[StageMetrics], None]] = None,
+                 profile_dir: Optional[str] = None):
+        self.on_stage = on_stage
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.stages: List[StageMetrics] = []
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.info: Dict[str, object] = {}
+
+    def add(self, record: StageMetrics):
+        """Record a finished stage and notify the hook"""
+        self.stages.append(record)
+        if self.on_stage:
+            self.on_stage(record)
+
+    @contextmanager
+    def stage(self, name: str, pages: int = 0) -> Iterator[StageMetrics]:
+        """Measure the enclosed block; the yielded record may be updated inside it"""
+        record = StageMetrics(name, pages=pages, rss_start_bytes=current_rss_bytes())
+        profiler = cProfile.Profile() if self.profile_dir else None
+        max_rss_start, workers_max_rss_start = peak_rss_bytes(), workers_peak_rss_bytes()
+        wall_start, cpu_start = time.perf_counter(), cpu_seconds()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler:
+                profiler.disable()
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                safe_name = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in name)
+                profiler.dump_stats(self.profile_dir / f"{len(self.stages):02d}-{safe_name}.prof")
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = cpu_seconds() - cpu_start
+            record.max_rss_bytes = peak_rss_bytes()
+            if record.max_rss_bytes is not None:
+                record.max_rss_growth_bytes = record.max_rss_bytes - max_rss_start
+            workers_max_rss = workers_peak_rss_bytes()
+            if workers_max_rss is not None and workers_max_rss > workers_max_rss_start:
+                record.workers_max_rss_bytes = workers_max_rss
+            self.add(record)
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def to_dict(self) -> Dict[str, object]:
+        wall = (self.finished or time.perf_counter()) - self.started
+        pages = self.info.get("page_count") or 0
+        return {
+            **self.info,
+            "wall_seconds": wall,
+            "pages_per_second": pages / wall if pages and wall > 0 else None,
+            "output_bytes": sum(stage.output_bytes for stage in self.stages if stage.name.startswith("write:")),
+            "bytes_saved": sum(stage.extra.get("bytes_saved", 0) for stage in self.stages),
+            "max_rss_bytes": peak_rss_bytes(),
+            "workers_max_rss_bytes": workers_peak_rss_bytes() or None,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+    def write_json(self, path: str) -> Path:
+        """Write the run metrics as JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
@@ -0,0 +1,110 @@
+import json
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from pypdf import PdfReader
+from .document import open_input
+from .writer import ChapterWriter, ChapterWriteResult
+
+
+MANIFEST_FILENAME = "chapters.json"
+MANIFEST_VERSION = 1
+
+# How far the page ranges found by each detection method can be trusted
+METHOD_CONFIDENCE = {"outline": 1.0, "toc": 0.9, "header": 0.7, "text": 0.6}
+DEFAULT_CONFIDENCE = 0.5
+
+# Confidence of a front matter / first chapter boundary estimated from line counts
+ESTIMATED_CONFIDENCE = 0.3
+
+
+@dataclass
+class PlannedChapter:
+    """One output file of a split plan (pages are 0-based and inclusive)"""
+    index: int
+    start_page: int
+    end_page: int
+    title: str
+    method: str
+    confidence: float
+
+    @property
+    def filename(self) -> str:
+        return f"{self.index:03d}.pdf"
+
+    @property
+    def page_count(self) -> int:
+        return self.end_page - self.start_page + 1
+
+
+@dataclass
+class SplitPlan:
+    """Chapter page ranges of one PDF, stored as a JSON manifest instead of files
+
+    ``pdf_path`` is None when the plan was made from an in-memory PDF.
+    """
+    pdf_path: Optional[str]
+    page_count: int
+    detection_method: Optional[str]
+    chapters: List[PlannedChapter] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "version": MANIFEST_VERSION,
+            "pdf_path": self.pdf_path,
+            "page_count": self.page_count,
+            "detection_method": self.detection_method,
+            "chapters": [{**asdict(chapter), "filename": chapter.filename} for chapter in self.chapters],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "SplitPlan":
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version {data.get('version')!r}")
+        names = [f.name for f in fields(PlannedChapter)]
+        chapters = [PlannedChapter(**{name: entry[name] for name in names}) for entry in data["chapters"]]
+        return cls(data["pdf_path"], data["page_count"], data["detection_method"], chapters)
+
+    def write_json(self, path: str) -> Path:
+        """Write the plan as a JSON manifest"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SplitPlan":
+        """Read a plan from a JSON manifest"""
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def select(self, indices: Optional[Iterable[int]] = None) -> List[PlannedChapter]:
+        """Chapters with the given file indices (all chapters when None)"""
+        if indices is None:
+            return list(self.chapters)
+        by_index = {chapter.index: chapter for chapter in self.chapters}
+        missing = sorted(set(indices) - set(by_index))
+        if missing:
+            raise ValueError(f"Manifest has no chapter {', '.join(map(str, missing))}")
+        return [by_index[index] for index in sorted(set(indices))]
+
+
+def materialize(plan: SplitPlan, output_dir: str, indices: Optional[Iterable[int]] = None,
+                pdf_path: Optional[str] = None, write_workers: int = 1,
+                optimize: bool = False, use_mmap: bool = False) -> List[ChapterWriteResult]:
+    """Write the planned chapters (all, or the selected file indices) as PDF files
+
+    ``pdf_path`` overrides the source recorded in the manifest, e.g. after
+    the book has been moved.  ``use_mmap`` reads it through a memory map.
+    """
+    chapters = plan.select(indices)
+    if not (pdf_path or plan.pdf_path):
+        raise ValueError("The manifest does not name its source PDF; pass pdf_path")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open_input(pdf_path or plan.pdf_path, use_mmap) as file:
+        reader = PdfReader(file, strict=False)
+        if len(reader.pages) != plan.page_count:
+            raise ValueError(f"PDF has {len(reader.pages)} pages but the manifest expects {plan.page_count}")
+        writer = ChapterWriter(reader, output_dir, write_workers, optimize)
+        return writer.write_files([(chapter.start_page, chapter.end_page, chapter.filename)
+                                   for chapter in chapters])
@@ -0,0 +1,433 @@
+import contextlib
+import io
+import ipaddress
+import json
+import os
+import socketserver
+import stat
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+from .document import PDFSource
+from .plan import MANIFEST_FILENAME
+from .splitter import PDFChapterSplitter
+from .timeouts import JobTimeout, time_limit
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Jobs waiting for a worker beyond those running; further jobs are rejected
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_JOB_TIMEOUT = 300.0
+# How long past its own time limit a job may take before the server stops
+# waiting; only matters for a hung worker, since workers enforce the limit
+TIMEOUT_GRACE = 5.0
+# Interval at which a waiting request checks whether its job has started
+START_POLL_SECONDS = 0.05
+MAX_UPLOAD_BYTES = 512 * 2**20
+
+# Splitter options a client may set per job; the rest are fixed by the server
+JOB_OPTIONS = ("detection", "chapter_range", "header_band", "rank_by_font_size", "write_workers",
+               "incremental", "optimize", "use_mmap", "page_timeout", "document_timeout")
+
+PDF_CONTENT_TYPES = ("application/pdf", "application/octet-stream")
+
+# HTTP status of each job outcome
+STATUS_CODES = {"ok": HTTPStatus.OK, "failed": HTTPStatus.UNPROCESSABLE_ENTITY,
+                "timeout": HTTPStatus.GATEWAY_TIMEOUT}
+
+
+@dataclass
+class SplitJob:
+    """One split request: a PDF path or its bytes, and where the result goes
+
+    Without ``plan_only`` the chapters are written to ``output_dir`` and
+    their paths returned; with it, the chapter manifest is returned (and
+    also written to ``output_dir`` when one is given).
+    """
+    source: PDFSource
+    output_dir: Optional[str] = None
+    plan_only: bool = False
+    options: Dict[str, object] = field(default_factory=dict)
+    timeout: Optional[float] = None
+
+
+def _warm_up() -> int:
+    """No-op task that makes a pool worker start (and import everything) ahead of the first job"""
+    return os.getpid()
+
+
+def run_job(job: SplitJob) -> Dict[str, object]:
+    """Run one job inside a pool worker; failures and timeouts are reported in the result"""
+    started = time.perf_counter()
+    try:
+        with time_limit(job.timeout, "Job time limit exceeded"), contextlib.redirect_stdout(io.StringIO()):
+            splitter = PDFChapterSplitter(job.source, job.output_dir, **job.options)
+            if job.plan_only:
+                plan = splitter.plan()
+                if job.output_dir:
+                    plan.write_json(Path(job.output_dir) / MANIFEST_FILENAME)
+                output = {"manifest": plan.to_dict()}
+            else:
+                output = {"files": [str(path) for path in splitter.split()]}
+    except JobTimeout as e:
+        return {"status": "timeout", "error": str(e), "seconds": time.perf_counter() - started}
+    except Exception as e:
+        return {"status": "failed", "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - started}
+    return {"status": "ok", "seconds": time.perf_counter() - started, "page_count": splitter.document.page_count,
+            "detection_method": splitter.detection_method,
+            "slow_pages": [{"page": page.index + 1, "seconds": page.seconds, "aborted": page.aborted}
+                           for page in splitter.document.slow_pages], **output}
+
+
+@dataclass
+class ServerStats:
+    """Counters of a running server"""
+    started: float = field(default_factory=time.monotonic)
+    # Jobs admitted and not finished yet, running or waiting for a worker
+    pending: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    rejected: int = 0
+    # Worker pools replaced after a crash or a hung job
+    pool_restarts: int = 0
+    pages: int = 0
+    job_seconds: float = 0.0
+
+
+class SplitService:
+    """Warm pool of worker processes behind a bounded job queue
+
+    At most ``workers + queue_size`` jobs are admitted at once; ``submit``
+    returns None for any job beyond that, so callers can push back instead
+    of queueing without limit.  Each job runs under a time limit enforced
+    inside its worker; a job that still overruns it (e.g. stuck in C code)
+    gets its pool killed and replaced, failing the other jobs in flight
+    rather than holding a worker forever.  ``options`` are splitter options
+    applied to every job (e.g. the extraction cache).
+    """
+
+    def __init__(self, workers: int = 1, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 timeout: float = DEFAULT_JOB_TIMEOUT, options: Optional[Dict[str, object]] = None):
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        if queue_size < 0:
+            raise ValueError("queue_size must be 0 or a positive integer")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.options = dict(options or {})
+        self.stats = ServerStats()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        # Guards replacing the pool; separate from _lock, which done-callbacks
+        # of a dying pool need
+        self._pool_lock = threading.Lock()
+        # Futures whose pool was killed because they overran
+        self._expired = set()
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    def warm_up(self):
+        """Start every worker process now rather than on the first jobs"""
+        futures = [self._executor.submit(_warm_up) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, job: SplitJob) -> Optional[Future]:
+        """Queue a job, or return None when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats.rejected += 1
+            return None
+
+        job.options = {**self.options, **job.options}
+        job.timeout = min(job.timeout or self.timeout, self.timeout)
+        with self._lock:
+            self.stats.pending += 1
+        try:
+            future = self._submit(job)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def _submit(self, job: SplitJob) -> Future:
+        executor = self._executor
+        try:
+            return executor.submit(run_job, job)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed or out of memory); start a fresh pool
+            self._restart_pool(executor)
+            return self._executor.submit(run_job, job)
+
+    def _restart_pool(self, executor: ProcessPoolExecutor):
+        """Kill the workers of executor and replace it with a warm pool
+
+        Does nothing if another thread already replaced it.
+        """
+        with self._pool_lock:
+            if self._executor is not executor:
+                return
+            # A running call cannot be cancelled, so stop the processes; the
+            # pool then fails its pending futures with BrokenProcessPool
+            for process in list((executor._processes or {}).values()):
+                process.kill()
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self.warm_up()
+        with self._lock:
+            self.stats.pool_restarts += 1
+
+    def _finished(self, future: Future):
+        try:
+            result = future.result()
+        except (Exception, CancelledError) as e:
+            result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+        with self._lock:
+            if future in self._expired:
+                self._expired.discard(future)
+                result = {"status": "timeout"}
+            if result["status"] == "ok":
+                self.stats.completed += 1
+                self.stats.pages += result["page_count"]
+            elif result["status"] == "timeout":
+                self.stats.timed_out += 1
+            else:
+                self.stats.failed += 1
+            self.stats.job_seconds += result.get("seconds", 0.0)
+        self._release()
+
+    def _release(self):
+        with self._lock:
+            self.stats.pending -= 1
+        self._slots.release()
+
+    def run(self, job: SplitJob) -> Tuple[int, Dict[str, object]]:
+        """Run a job to completion; returns an HTTP status and the response body"""
+        future = self.submit(job)
+        if future is None:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"status": "rejected", "error": "Job queue is full"}
+        # Time spent queued does not count against the job
+        while not (future.running() or future.done()):
+            time.sleep(START_POLL_SECONDS)
+        try:
+            # A dispatched job can still wait in the pool's call queue for one
+            # running job to end, hence twice the limit
+            result = future.result(timeout=2 * job.timeout + TIMEOUT_GRACE)
+        except FutureTimeout:
+            # The worker ignored its own time limit; free its slot by force
+            with self._lock:
+                self._expired.add(future)
+            if not future.cancel() and not future.done():
+                self._restart_pool(self._executor)
+            return HTTPStatus.GATEWAY_TIMEOUT, {"status": "timeout", "error": "Job did not finish in time"}
+        except BrokenProcessPool:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"status": "rejected", "error": "Worker pool was restarted"}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+        return STATUS_CODES.get(result["status"], HTTPStatus.INTERNAL_SERVER_ERROR), result
+
+    def snapshot(self) -> Dict[str, object]:
+        """Queue depth, job counts and throughput since start"""
+        with self._lock:
+            stats = ServerStats(**vars(self.stats))
+        uptime = time.monotonic() - stats.started
+        finished = stats.completed + stats.failed + stats.timed_out
+        running = min(stats.pending, self.workers)
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": running,
+            "queued": stats.pending - running,
+            "completed": stats.completed,
+            "failed": stats.failed,
+            "timed_out": stats.timed_out,
+            "rejected": stats.rejected,
+            "pool_restarts": stats.pool_restarts,
+            "pages": stats.pages,
+            "uptime_seconds": uptime,
+            "jobs_per_second": finished / uptime if uptime else 0.0,
+            "pages_per_second": stats.pages / uptime if uptime else 0.0,
+            "mean_job_seconds": stats.job_seconds / finished if finished else 0.0,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _option_value(text: str) -> object:
+    """Query string value: a JSON literal (true, 0.2, [1, 40]) or a plain string"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_job(content_type: str, body: bytes, query: str) -> SplitJob:
+    """Build a job from a request
+
+    A PDF body (application/pdf) is split from memory, with output_dir,
+    plan, timeout and splitter options given in the query string.  A JSON
+    body names a file instead: {"path", "output_dir", "plan", "timeout",
+    "options"}.  Raises ValueError for malformed requests.
+    """
+    if content_type in PDF_CONTENT_TYPES:
+        fields = {key: _option_value(value) for key, value in parse_qsl(query)}
+        request = {"output_dir": fields.pop("output_dir", None), "plan": fields.pop("plan", False),
+                   "timeout": fields.pop("timeout", None), "options": fields}
+        source = body
+    else:
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise ValueError("Request body must be a PDF or a JSON job")
+        if not isinstance(request, dict) or not isinstance(request.get("path"), str):
+            raise ValueError("JSON job needs a \"path\" string")
+        source = request["path"]
+
+    options = request.get("options") or {}
+    if not isinstance(options, dict):
+        raise ValueError("\"options\" must be an object")
+    unknown = sorted(set(options) - set(JOB_OPTIONS))
+    if unknown:
+        raise ValueError(f"Unsupported options: {', '.join(unknown)}")
+    if "chapter_range" in options:
+        options["chapter_range"] = tuple(options["chapter_range"])
+
+    plan_only = bool(request.get("plan"))
+    output_dir = request.get("output_dir")
+    if isinstance(source, bytes) and not (output_dir or plan_only):
+        raise ValueError("An uploaded PDF needs output_dir unless plan is set")
+    timeout = request.get("timeout")
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ValueError("timeout must be a positive number of seconds")
+    return SplitJob(source, str(output_dir) if output_dir else None, plan_only, options, timeout)
+
+
+class SplitRequestHandler(BaseHTTPRequestHandler):
+    """POST /split runs a job; GET /stats reports the service counters"""
+
+    server_version = "pdf-chapter-splitter"
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/stats":
+            self._send_json(HTTPStatus.OK, self.server.service.snapshot())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/split":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_UPLOAD_BYTES:
+            self.close_connection = True
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body is too large"})
+            return
+        try:
+            content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+            job = parse_job(content_type, self.rfile.read(length), url.query)
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+
+        status, body = self.server.service.run(job)
+        headers = {"Retry-After": "1"} if status == HTTPStatus.SERVICE_UNAVAILABLE else {}
+        self._send_json(status, body, headers)
+
+    def _send_json(self, status: int, body: Dict[str, object], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no host address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class UnixSplitServer(socketserver.ThreadingUnixStreamServer):
+    """HTTP over a Unix domain socket"""
+    daemon_threads = True
+
+
+def is_loopback(host: str) -> bool:
+    """Whether host only accepts connections from this machine"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def remove_stale_socket(socket_path: str):
+    """Remove a socket left behind by an earlier server, refusing to delete anything else"""
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{socket_path} exists and is not a socket")
+    os.unlink(socket_path)
+
+
+def make_server(service: SplitService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                socket_path: Optional[str] = None, verbose: bool = False) -> socketserver.BaseServer:
+    """HTTP server for the service on a localhost port, or on a Unix socket when socket_path is set
+
+    Jobs name files to read and directories to write on this machine, so
+    only loopback addresses are accepted for ``host``.
+    """
+    if socket_path:
+        remove_stale_socket(socket_path)
+        server = UnixSplitServer(socket_path, SplitRequestHandler)
+    elif not is_loopback(host):
+        raise ValueError(f"Refusing to listen on {host}: jobs can read and write any file the server can, "
+                         "so only loopback addresses are allowed")
+    else:
+        server = ThreadingHTTPServer((host, port), SplitRequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: Optional[str] = None,
+          workers: int = 1, queue_size: int = DEFAULT_QUEUE_SIZE, timeout: float = DEFAULT_JOB_TIMEOUT,
+          options: Optional[Dict[str, object]] = None, verbose: bool = False):
+    """Run the split server until interrupted"""
+    service = SplitService(workers, queue_size, timeout, options)
+    try:
+        with make_server(service, host, port, socket_path, verbose) as server:
+            try:
+                service.warm_up()
+                address = socket_path or f"http://{server.server_address[0]}:{server.server_address[1]}"
+                print(f"Listening on {address} with {workers} worker(s), queue size {queue_size}")
+                server.serve_forever()
+            except KeyboardInterrupt:
+                print("Shutting down...")
+            finally:
+                if socket_path:
+                    remove_stale_socket(socket_path)
+    finally:
+        service.close()
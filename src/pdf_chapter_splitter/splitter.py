@@ -1,168 +1,327 @@
-import re
 from pathlib import Path
-from typing import List, Tuple, Optional
-from pypdf import PdfReader, PdfWriter
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
+from .cache import DEFAULT_CACHE_MAX_BYTES, ExtractionCache
+from .document import DEFAULT_HEADER_BAND, ExtractedText, LinePageIndex, PDFDocument, PDFSource
+from .incremental import IncrementalState
+from .matcher import CHAPTER_ONLY_PATTERN, DEFAULT_CHAPTER_RANGE, HeadingMatch, HeadingMatcher, convert_number
+from .metrics import RunMetrics, StageMetrics, peak_rss_bytes
+from .plan import (DEFAULT_CONFIDENCE, ESTIMATED_CONFIDENCE, MANIFEST_FILENAME, METHOD_CONFIDENCE,
+                   PlannedChapter, SplitPlan)
+from .writer import ChapterBuffer, ChapterWriter, ChapterWriteResult
+
+
+# Chapter detection strategies: "outline" reads bookmarks, "toc" follows the
+# printed table of contents, "header" scans only the top band of each page,
+# "text" scans every page for headings, and "auto" tries outline, then toc,
+# then falls back to text
+DETECTION_MODES = ("auto", "outline", "toc", "header", "text")
+
+# An outline needs at least this many top-level entries to drive the split
+MIN_OUTLINE_CHAPTERS = 2
+
+# Table of contents guided detection: pages scanned for the TOC, the largest
+# gap between printed and physical page numbers, and how far around each
+# predicted page a chapter heading is searched for
+TOC_SCAN_PAGES = 15
+MIN_TOC_CHAPTERS = 2
+MAX_TOC_PAGE_OFFSET = 40
+TOC_VERIFY_RADIUS = 2
 
 
 class PDFChapterSplitter:
-    def __init__(self, pdf_path: str, output_dir: Optional[str] = None):
-        self.pdf_path = Path(pdf_path)
-        self.output_dir = Path(output_dir) if output_dir else self.pdf_path.parent / "output"
-        self.output_dir.mkdir(exist_ok=True)
+    """Detects the chapters of one PDF and splits it into files or in-memory buffers
+
+    ``pdf_path`` may also be the PDF's bytes or a seekable binary stream; such
+    sources need an explicit ``output_dir`` for file output.  The output
+    directory is only created when files are written.
+    """
+
+    def __init__(self, pdf_path: PDFSource, output_dir: Optional[str] = None, detection: str = "auto",
+                 jobs: int = 1, write_workers: int = 1, cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 chapter_range: Tuple[int, int] = DEFAULT_CHAPTER_RANGE, streaming: bool = False,
+                 on_stage: Optional[Callable[[StageMetrics], None]] = None, profile_dir: Optional[str] = None,
+                 header_band: float = DEFAULT_HEADER_BAND, rank_by_font_size: bool = False,
+                 incremental: bool = False, optimize: bool = False, use_mmap: bool = False,
+                 page_timeout: Optional[float] = None, document_timeout: Optional[float] = None,
+                 measure_savings: bool = False):
+        if detection not in DETECTION_MODES:
+            raise ValueError(f"Unknown detection mode '{detection}' (choose from {', '.join(DETECTION_MODES)})")
+        if not 0 < header_band <= 1:
+            raise ValueError("header_band must be a fraction of the page height in (0, 1]")
+        if incremental and streaming:
+            raise ValueError("Incremental mode cannot be combined with streaming")
+        self.detection = detection
+        self.matcher = HeadingMatcher(chapter_range)
+        cache = ExtractionCache(cache_dir, cache_max_bytes) if cache_dir else None
+        # use_mmap reads a source file through a shared read-only memory map;
+        # pages over the extraction time budgets are recorded as empty
+        self.document = PDFDocument(pdf_path, jobs=jobs, cache=cache, use_mmap=use_mmap,
+                                    page_timeout=page_timeout, document_timeout=document_timeout)
+        # None for in-memory sources
+        self.pdf_path = self.document.pdf_path
+        self.output_dir: Optional[Path] = None
+        if output_dir:
+            self.output_dir = Path(output_dir)
+        elif self.pdf_path is not None:
+            self.output_dir = self.pdf_path.parent / "output"
+        self.write_workers = write_workers
+        self.streaming = streaming
+        self.header_band = header_band
+        self.rank_by_font_size = rank_by_font_size
+        self.write_results: List[ChapterWriteResult] = []
+        # Incremental mode rewrites only outputs whose source pages changed
+        self.incremental = incremental
+        self.skipped_files: List[Path] = []
+        # Shrink outputs (pruned resources, compressed streams, merged objects);
+        # measure_savings also writes each one unoptimized to report the saving
+        self.optimize = optimize
+        self.measure_savings = measure_savings
+        self.detection_method: Optional[str] = None
+        # Set when the first chapter boundary was estimated from line counts
+        self.front_matter_estimated = False
+        # Stage timings of the latest run; on_stage is called as each stage ends
+        self.on_stage = on_stage
+        self.profile_dir = profile_dir
+        self.metrics = RunMetrics(on_stage, profile_dir)
         
-    def extract_text(self) -> str:
-        """Extract text from PDF"""
+    def extract_pages(self) -> ExtractedText:
+        """Extract per-page text and the line offset of each page in a single pass"""
         print("Loading PDF with pypdf...")
         try:
-            with open(self.pdf_path, 'rb') as file:
-                reader = PdfReader(file, strict=False)
-                print(f"PDF page count: {len(reader.pages)}")
-                text = ""
-                for i, page in enumerate(reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        text += page_text + "\n"
-                        if i == 0:  # Display part of the first page
-                            print(f"First page sample: {page_text[:200]}...")
-                    except Exception as e:
-                        print(f"Warning: Error loading page {i+1}: {e}")
-                        continue
-            return text
+            print(f"PDF page count: {self.document.page_count}")
+            extracted = self.document.extract_pages()
+            if self.document.cache is not None and self.document.cache.hits:
+                print(f"Loaded page text from cache '{self.document.cache.directory}'")
+            if extracted.pages and extracted.pages[0] is not None:  # Display part of the first page
+                print(f"First page sample: {extracted.pages[0][:200]}...")
+            return extracted
         except Exception as e:
             print(f"Error with pypdf: {e}")
             raise
     
-    def find_chapter_boundaries(self, text: str) -> List[Tuple[int, str]]:
-        """Find chapter boundaries (simple approach: only adopt first occurrence of each chapter)"""
-        lines = text.split('\n')
-        chapter_boundaries = []
-        
-        print("Detecting chapters...")
+    def extract_text(self) -> str:
+        """Extract text from PDF"""
+        return self.extract_pages().text
+    
+    def find_chapter_boundaries(self, text: Union[str, ExtractedText]) -> List[Tuple[int, str]]:
+        """Find chapter boundaries (simple approach: only adopt first occurrence of each chapter)
         
-        # Record only the first occurrence of each chapter number
-        seen_chapters = set()
+        Explicit headings (第N章, Chapter N) take precedence: "N. Title" and
+        "N Title" lines are only used when the text has no explicit heading.
+        """
+        lines = text.split('\n') if isinstance(text, str) else text.iter_lines()
+        # First occurrence of each chapter number, kept per heading strength
+        candidates = {True: {}, False: {}}
         
-        # Chapter pattern (specialized for Japanese chapter numbers only)
-        # Chapter pattern
+        print("Detecting chapters...")
         
         for i, line in enumerate(lines):
             line = line.strip()
-            if not line or len(line) < 10:
-                continue
-            
-            # 章番号とタイトルを抽出
-            chapter_match = re.match(chapter_pattern, line)
-            if not chapter_match:
-                continue
-            
-            chapter_num_str = chapter_match.group(1)
-            chapter_title = chapter_match.group(2).strip()
-            
-            # Convert chapter number to digit
-            chapter_num = self._convert_to_number(chapter_num_str)
-            if chapter_num is None:
-                continue
-            
-            # Only chapters within range 1-15
-            if chapter_num < 1 or chapter_num > 15:
-                continue
-            
-            # Skip already found chapters (adopt only first occurrence)
-            if chapter_num in seen_chapters:
+            heading = self._match_heading_line(line)
+            if heading is None:
                 continue
-            
-            # Exclude obvious page headers
-            if self._is_obviously_header(line):
-                continue
-            
-            # Determine as true chapter start
-            chapter_boundaries.append((i, line))
-            seen_chapters.add(chapter_num)
-            print(f"Detected chapter {chapter_num}: line {i} - {line}")
+            candidates[heading.explicit].setdefault(heading.number, (i, line))
+        
+        chosen = candidates[True] or candidates[False]
+        for number, (i, line) in sorted(chosen.items(), key=lambda item: item[1][0]):
+            print(f"Detected chapter {number}: line {i} - {line}")
         
         # Return in order of appearance
-        return chapter_boundaries
+        return sorted(chosen.values())
     
-    def _find_toc_chapters(self, lines: List[str]) -> List[Tuple[int, str]]:
-        """Extract chapter list from table of contents"""
-        toc_chapters = []
+    def _match_heading_line(self, line: str) -> Optional[HeadingMatch]:
+        """Heading of a stripped line, unless it looks like a page header
+        
+        Short headings such as "Chapter 1" or "第一章" count; the weak kinds
+        ("N. Title", "N Title") only match with a title after the number.
+        """
+        if not line:
+            return None
+        
+        # Extract chapter number and title (only chapters within the configured range)
+        heading = self.matcher.match(line)
+        if heading is None:
+            return None
+        
+        # Exclude obvious page headers; a title-less heading ("Chapter 1",
+        # "第一章") ends in its own number, not a page number
+        if heading.title:
+            if self._is_obviously_header(line):
+                return None
+        elif CHAPTER_ONLY_PATTERN.match(line):
+            return None
+        return heading
+    
+    def _match_chapter_start(self, line: str, seen_chapters: Dict[int, bool]) -> Optional[HeadingMatch]:
+        """Heading of a stripped line if it starts a chapter not seen yet
+        
+        ``seen_chapters`` maps each chapter number found so far to whether its
+        heading was explicit.  Once any explicit heading has been seen, weak
+        ("N. Title", "N Title") matches are ignored, and an explicit heading
+        is not blocked by a weak match of the same number.
+        """
+        heading = self._match_heading_line(line)
+        if heading is None:
+            return None
+        
+        if heading.explicit:
+            # Skip already found chapters (adopt only first occurrence)
+            if seen_chapters.get(heading.number):
+                return None
+        elif any(seen_chapters.values()) or heading.number in seen_chapters:
+            return None
+        return heading
+    
+    def _find_toc_chapters(self, lines: List[str]) -> List[Tuple[int, str, int]]:
+        """Extract chapter list from table of contents as (chapter, title, printed page)"""
+        toc_chapters = {}
         
         # Search for table of contents-like sections (first ~300 lines)
         for i, line in enumerate(lines[:300]):
             line = line.strip()
             # Look for "Chapter X  Title  ...  Page Number" format
-            match = re.match(r'^([0-9]+)章\s*(.+?)\s*[ʜ…\.]*\s*([0-9]+)\s*$', line)
-            if match:
-                chapter_num = int(match.group(1))
-                title = match.group(2).strip()
+            entry = self.matcher.match_toc_entry(line)
+            if entry:
+                chapter_num, title, _ = entry
                 if len(title) > 5:  # Title is sufficiently long
-                    toc_chapters.append((chapter_num, title))
+                    toc_chapters.setdefault(chapter_num, entry)
         
-        return sorted(toc_chapters, key=lambda x: x[0])
+        return sorted(toc_chapters.values(), key=lambda x: x[0])
+    
+    def _page_has_chapter(self, page_num: int, chapter_num: int, title: str) -> bool:
+        """Check a single page for the heading of a given chapter"""
+        page_text = self.document.page_text(page_num)
+        if not page_text:
+            return False
+        compact_title = "".join(title.split())
+        for line in page_text.split('\n'):
+            line = line.strip()
+            if not line or self._is_obviously_header(line):
+                continue
+            # Table of contents entries are explicit, so only explicit headings confirm them
+            heading = self.matcher.match(line)
+            if heading is not None and heading.explicit and heading.number == chapter_num:
+                return True
+            if len(compact_title) > 5 and compact_title in "".join(line.split()):
+                return True
+        return False
+    
+    def _find_toc_page_offset(self, first_entry: Tuple[int, str, int], first_body_page: int) -> Optional[int]:
+        """Offset between printed and physical page numbers, from the first chapter"""
+        chapter_num, title, printed_page = first_entry
+        for offset in range(MAX_TOC_PAGE_OFFSET + 1):
+            page_num = printed_page - 1 + offset
+            if page_num >= self.document.page_count:
+                break
+            if page_num >= first_body_page and self._page_has_chapter(page_num, chapter_num, title):
+                return offset
+        return None
+    
+    def find_toc_chapter_starts(self) -> Optional[List[Tuple[int, str]]]:
+        """Verified (start page, title) pairs from the printed table of contents
+
+        Decodes only the first TOC_SCAN_PAGES pages plus a few pages around
+        each predicted chapter start.  Returns None if any chapter cannot be
+        found where the table of contents puts it.
+        """
+        page_count = self.document.page_count
+        toc_chapters = []
+        last_toc_page = -1
+        for page_num in range(min(TOC_SCAN_PAGES, page_count)):
+            page_text = self.document.page_text(page_num)
+            entries = self._find_toc_chapters(page_text.split('\n')) if page_text else []
+            if entries:
+                toc_chapters.extend(entries)
+                last_toc_page = page_num
+        
+        # Keep the first entry for each chapter number
+        toc_chapters = sorted({entry[0]: entry for entry in reversed(toc_chapters)}.values())
+        if len(toc_chapters) < MIN_TOC_CHAPTERS:
+            return None
+        print(f"Found {len(toc_chapters)} chapters in table of contents (up to page {last_toc_page + 1})")
+        
+        offset = self._find_toc_page_offset(toc_chapters[0], last_toc_page + 1)
+        if offset is None:
+            print("Could not locate the first chapter listed in the table of contents.")
+            return None
+        print(f"Physical page = printed page + {offset}")
+        
+        chapter_starts = []
+        for chapter_num, title, printed_page in toc_chapters:
+            predicted = printed_page - 1 + offset
+            # Check the predicted page first, then move outwards
+            candidates = [predicted + delta for radius in range(TOC_VERIFY_RADIUS + 1)
+                          for delta in ((0,) if radius == 0 else (-radius, radius))]
+            previous_start = chapter_starts[-1][0] if chapter_starts else last_toc_page
+            found = next((page_num for page_num in candidates
+                          if previous_start < page_num < page_count
+                          and self._page_has_chapter(page_num, chapter_num, title)), None)
+            if found is None:
+                print(f"Chapter {chapter_num} not found near page {predicted + 1}.")
+                return None
+            chapter_starts.append((found, title))
+        return chapter_starts
+    
+    def find_header_chapter_starts(self) -> List[Tuple[int, str]]:
+        """Chapter start pages from headings in the top band of each page
+        
+        Only the header band is decoded.  The first occurrence of each chapter
+        wins, or with ``rank_by_font_size`` the occurrence set in the largest
+        type (running heads and TOC lines are usually smaller than the real
+        heading).
+        """
+        # Candidates per heading strength; weak ones only count without explicit ones
+        candidates = {True: {}, False: {}}
+        for page_num in range(self.document.page_count):
+            for line in self.document.header_lines(page_num, self.header_band):
+                heading = self._match_heading_line(line.text)
+                if heading is None:
+                    continue
+                ranked = candidates[heading.explicit]
+                best = ranked.get(heading.number)
+                if best is None or (self.rank_by_font_size and line.font_size > best[2]):
+                    ranked[heading.number] = (page_num, line.text, line.font_size)
+        
+        # Keep the first chapter starting on each page
+        chapter_starts = {}
+        for page_num, title, _ in sorted((candidates[True] or candidates[False]).values(), key=lambda c: c[0]):
+            chapter_starts.setdefault(page_num, title)
+        return sorted(chapter_starts.items())
     
     def _convert_to_number(self, num_str: str) -> Optional[int]:
         """Convert chapter number to digit"""
-        # For numeric case
-        if num_str.isdigit():
-            return int(num_str)
-        
-        # For Chinese numeral case
-        kanji_nums = {
-            '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
-            '六': 6, '七': 7, '八': 8, '九': 9, '十': 10,
-            '十一': 11, '十二': 12
-        }
-        return kanji_nums.get(num_str)
+        return convert_number(num_str)
     
     def _extract_chapter_number(self, line: str) -> int:
         """Extract chapter number from line"""
-        match = re.match(r'^第?\s*([0-9一二三四五六七八九十]+)\s*章', line)
-        if match:
-            return self._convert_to_number(match.group(1)) or 0
-        return 0
+        heading = self.matcher.match(line.strip())
+        return heading.number if heading else 0
     
     def _is_obviously_header(self, line: str) -> bool:
         """Determine if obviously a page header (simple version)"""
-        
-        # 1. Contains line characters (table of contents or decoration)
-        if 'ʜ' in line or '…' in line or re.search(r'[\.]{3,}', line):
-            return True
-        
-        # 2. Has page number-like digits at the end
-        if re.search(r'\s+[0-9]+\s*$', line):
-            return True
-        
-        # 3. Exclude lines with only chapter numbers
-        if re.match(r'^\s*[0-9]+章\s*$', line):
-            return True
-        
-        return False
+        return self.matcher.is_obviously_header(line)
     
     def _estimate_pages_from_line(self, line_number: int) -> int:
         """Estimate page count from line number"""
         try:
-            with open(self.pdf_path, 'rb') as file:
-                reader = PdfReader(file, strict=False)
-                
-                # Calculate average lines per page from first few pages
-                total_lines = 0
-                pages_to_sample = min(5, len(reader.pages))
-                
-                for i in range(pages_to_sample):
-                    try:
-                        page_text = reader.pages[i].extract_text()
-                        page_lines = len(page_text.split('\n'))
-                        total_lines += page_lines
-                    except Exception:
-                        continue
+            # Calculate average lines per page from first few pages
+            total_lines = 0
+            pages_to_sample = min(5, self.document.page_count)
+            
+            for i in range(pages_to_sample):
+                page_text = self.document.page_text(i)
+                if page_text is None:
+                    continue
+                total_lines += len(page_text.split('\n'))
+            
+            if total_lines > 0:
+                avg_lines_per_page = total_lines / pages_to_sample
+                estimated_page = int(line_number / avg_lines_per_page)
+                return max(1, estimated_page)  # Minimum 1 page
+            else:
+                return 1
                 
-                if total_lines > 0:
-                    avg_lines_per_page = total_lines / pages_to_sample
-                    estimated_page = int(line_number / avg_lines_per_page)
-                    return max(1, estimated_page)  # Minimum 1 page
-                else:
-                    return 1
-                    
         except Exception as e:
             print(f"Page estimation error: {e}")
             return 1
@@ -170,59 +329,34 @@ class PDFChapterSplitter:
     def get_page_breaks(self) -> List[int]:
         """Get starting line for each page"""
         try:
-            with open(self.pdf_path, 'rb') as file:
-                reader = PdfReader(file, strict=False)
-                page_breaks = [0]  # First page starts from line 0
-                current_line = 0
-                
-                for i, page in enumerate(reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        page_lines = len(page_text.split('\n'))
-                        current_line += page_lines
-                        page_breaks.append(current_line)
-                    except Exception as e:
-                        print(f"Warning: Error processing page {i+1}: {e}")
-                        page_breaks.append(current_line)
-                        
-            return page_breaks
+            return self.document.extract_pages().page_breaks
         except Exception as e:
             print(f"Page splitting process error: {e}")
             raise
     
-    def find_chapter_pages(self, chapter_boundaries: List[Tuple[int, str]]) -> List[Tuple[int, int, str]]:
+    def find_chapter_pages(self, chapter_boundaries: List[Tuple[int, str]],
+                           extracted: Optional[ExtractedText] = None) -> List[Tuple[int, int, str]]:
         """Calculate page range for each chapter"""
-        page_breaks = self.get_page_breaks()
+        index = extracted.index if extracted is not None else LinePageIndex(self.get_page_breaks())
+        # Resolve every boundary's page in one pass over the index
+        boundary_pages = index.pages_of_lines([line_num for line_num, _ in chapter_boundaries])
         chapter_pages = []
         
-        for i, (line_num, title) in enumerate(chapter_boundaries):
+        for i, (_, title) in enumerate(chapter_boundaries):
             # Find chapter start page (shift 1 page earlier)
-            start_page = 0
-            for j, page_break in enumerate(page_breaks):
-                if line_num >= page_break:
-                    start_page = j
-                else:
-                    break
+            start_page = boundary_pages[i]
             # Shift 1 page earlier except for first chapter
             if start_page > 0:
                 start_page -= 1
             
             # Set next chapter start page or final page as end page
             if i + 1 < len(chapter_boundaries):
-                next_line_num = chapter_boundaries[i + 1][0]
-                next_start_page = 0
-                for j, page_break in enumerate(page_breaks):
-                    if next_line_num >= page_break:
-                        next_start_page = j
-                    else:
-                        break
+                next_start_page = boundary_pages[i + 1]
                 # Set page before next chapter start as current chapter end (shift 1 page earlier)
                 end_page = max(start_page, next_start_page - 2)
             else:
                 # For last chapter, go to final page
-                with open(self.pdf_path, 'rb') as file:
-                    reader = PdfReader(file, strict=False)
-                    end_page = len(reader.pages) - 1
+                end_page = index.page_count - 1
             
             chapter_pages.append((start_page, end_page, title))
             
@@ -231,52 +365,239 @@ class PDFChapterSplitter:
     def split_pdf_by_pages(self, start_page: int, end_page: int, output_filename: str):
         """Split PDF by specified page range"""
         try:
-            with open(self.pdf_path, 'rb') as input_file:
-                reader = PdfReader(input_file, strict=False)
-                writer = PdfWriter()
-                
-                # Add pages in specified range
-                for page_num in range(start_page, min(end_page + 1, len(reader.pages))):
-                    try:
-                        writer.add_page(reader.pages[page_num])
-                    except Exception as e:
-                        print(f"Warning: Error adding page {page_num+1}: {e}")
-                        continue
-                
-                # Write to output file
-                output_path = self.output_dir / output_filename
-                with open(output_path, 'wb') as output_file:
-                    writer.write(output_file)
+            writer = ChapterWriter(self.document.reader, self.output_dir, optimize=self.optimize,
+                               measure_savings=self.measure_savings)
+            result = writer.write_chapter(start_page, end_page, output_filename)
         except Exception as e:
             print(f"PDF splitting error: {e}")
             raise
                 
-        return output_path
+        return result.path
+    
+    def write_chapters(self, chapter_pages: List[Tuple[int, int, str]]) -> List[ChapterWriteResult]:
+        """Write all chapters as 000.pdf, 001.pdf... from the shared reader
+        
+        In incremental mode, outputs whose fingerprint is unchanged are left
+        in place (listed in skipped_files) and outputs of a previous run that
+        are no longer produced are removed.
+        """
+        try:
+            writer = ChapterWriter(self.document.reader, self.output_dir, workers=self.write_workers,
+                                   optimize=self.optimize, measure_savings=self.measure_savings)
+            if self.incremental:
+                self.write_results = self._write_incremental(writer, chapter_pages)
+            else:
+                self.write_results = writer.write_all(chapter_pages)
+        except Exception as e:
+            print(f"PDF splitting error: {e}")
+            raise
+        
+        for result in self.write_results:
+            self._print_write(result)
+        return self.write_results
+    
+    def _write_incremental(self, writer: ChapterWriter,
+                           chapter_pages: List[Tuple[int, int, str]]) -> List[ChapterWriteResult]:
+        """Write only the chapters whose page range or source pages changed"""
+        state = IncrementalState.load(self.output_dir)
+        jobs = [(start_page, end_page, f"{i:03d}.pdf") for i, (start_page, end_page, _) in enumerate(chapter_pages)]
+        to_write, skipped = state.partition(self.document.reader, jobs, "optimize" if self.optimize else "")
+        
+        results = writer.write_files(to_write)
+        for result in results:
+            state.record(result)
+        removed = state.remove_stale([filename for _, _, filename in jobs])
+        state.save()
+        
+        self.skipped_files = [self.output_dir / filename for filename in skipped]
+        if skipped:
+            print(f"Skipped {len(skipped)} unchanged file(s): {', '.join(skipped)}")
+        for path in removed:
+            print(f"Removed stale output '{path.name}'")
+        return results
     
     def split(self) -> List[Path]:
         """Split PDF by chapters"""
-        print(f"Analyzing PDF file '{self.pdf_path}'...")
+        self.metrics = RunMetrics(self.on_stage, self.profile_dir)
+        self.skipped_files = []
+        output_files = []
+        try:
+            output_files = self._split()
+            return output_files
+        finally:
+            self._finish_run(len(output_files))
+    
+    def plan(self) -> SplitPlan:
+        """Detect chapters and return their page ranges without writing any PDF"""
+        self.metrics = RunMetrics(self.on_stage, self.profile_dir)
+        try:
+            print(f"Analyzing PDF file '{self.document.name}'...")
+            with self.metrics.stage("open") as stage:
+                stage.pages = self.document.page_count
+            
+            chapter_pages = self.detect_chapter_pages()
+            if not chapter_pages:
+                print("No chapter breaks found. Planning the entire document as one file.")
+                chapter_pages = [(0, self.document.page_count - 1, self.document_title)]
+            
+            method = self.detection_method
+            chapters = []
+            for i, (start_page, end_page, title) in enumerate(chapter_pages):
+                confidence = METHOD_CONFIDENCE.get(method, DEFAULT_CONFIDENCE)
+                # The estimate moves both the end of the front matter and the start of chapter 1
+                if self.front_matter_estimated and i < 2:
+                    confidence = ESTIMATED_CONFIDENCE
+                chapters.append(PlannedChapter(i, start_page, end_page, title, method, confidence))
+            pdf_path = str(self.pdf_path.resolve()) if self.pdf_path is not None else None
+            return SplitPlan(pdf_path, self.document.page_count, method, chapters)
+        finally:
+            self._finish_run(0)
+    
+    def _finish_run(self, output_file_count: int):
+        """Release the document and complete the run metrics"""
+        self.document.close()
+        self.metrics.finish()
+        self.metrics.info.update({
+            "pdf_path": self.document.name,
+            "page_count": self.document.known_page_count,
+            "detection_method": self.detection_method,
+            "output_files": output_file_count,
+            "skipped_files": len(self.skipped_files),
+            "open_count": self.document.open_count,
+            "slow_pages": [{"page": page.index + 1, "seconds": page.seconds, "aborted": page.aborted}
+                           for page in self.document.slow_pages],
+            "budget_skipped_pages": len(self.document.budget_skipped_pages),
+        })
+        print(f"PDF opened and parsed {self.document.open_count} time(s) during this run.")
+        if self.document.slow_pages:
+            print(f"Slow pages: {', '.join(page.describe() for page in self.document.slow_pages)}")
+    
+    def find_outline_chapters(self) -> List[Tuple[int, str]]:
+        """Read chapter start pages from top-level bookmarks (no text extraction)"""
+        reader = self.document.reader
+        try:
+            outline = reader.outline
+        except Exception as e:
+            print(f"Warning: Error reading outline: {e}")
+            return []
+        
+        page_count = self.document.page_count
+        chapter_starts = {}
+        for item in outline:
+            # Nested lists hold the children of the preceding top-level entry
+            if isinstance(item, list):
+                continue
+            try:
+                page_num = reader.get_destination_page_number(item)
+            except Exception:
+                continue
+            if page_num is None or not 0 <= page_num < page_count:
+                continue
+            # Keep the first bookmark pointing at each page
+            chapter_starts.setdefault(page_num, str(item.title or "").strip())
+        
+        return sorted(chapter_starts.items())
+    
+    def _pages_from_chapter_starts(self, chapter_starts: List[Tuple[int, str]]) -> List[Tuple[int, int, str]]:
+        """Turn chapter start pages into page ranges"""
+        last_page = self.document.page_count - 1
+        chapter_pages = []
+        for i, (start_page, title) in enumerate(chapter_starts):
+            end_page = chapter_starts[i + 1][0] - 1 if i + 1 < len(chapter_starts) else last_page
+            chapter_pages.append((start_page, end_page, title))
+        
+        # Add content before first chapter as 000.pdf
+        if chapter_pages and chapter_pages[0][0] > 0:
+            front_matter_end = chapter_pages[0][0] - 1
+            chapter_pages.insert(0, (0, front_matter_end, "Preface・Table of Contents"))
+            print(f"Saving preface・table of contents as 000.pdf (pages 1-{front_matter_end + 1})")
+        return chapter_pages
+    
+    def _detect_from_outline(self) -> Optional[List[Tuple[int, int, str]]]:
+        """Chapter page ranges from the outline, or None if it is not usable"""
+        print("Reading outline...")
+        chapter_starts = self.find_outline_chapters()
+        if len(chapter_starts) < MIN_OUTLINE_CHAPTERS:
+            print("No usable outline found.")
+            return None
         
-        # Extract text
-        text = self.extract_text()
+        print(f"Found {len(chapter_starts)} chapters in outline:")
+        for i, (start_page, title) in enumerate(chapter_starts):
+            print(f"  {i:02d}: {title} (page {start_page + 1})")
+        return self._pages_from_chapter_starts(chapter_starts)
+    
+    def _detect_from_toc(self) -> Optional[List[Tuple[int, int, str]]]:
+        """Chapter page ranges from the verified table of contents, or None"""
+        print("Reading table of contents...")
+        chapter_starts = self.find_toc_chapter_starts()
+        if chapter_starts is None:
+            print("No verifiable table of contents found.")
+            return None
+        
+        print(f"Verified {len(chapter_starts)} chapters after decoding "
+              f"{self.document.extracted_page_count} of {self.document.page_count} pages:")
+        for i, (start_page, title) in enumerate(chapter_starts):
+            print(f"  {i:02d}: {title} (page {start_page + 1})")
+        return self._pages_from_chapter_starts(chapter_starts)
+    
+    def _detect_from_header(self) -> Optional[List[Tuple[int, int, str]]]:
+        """Chapter page ranges from header-band headings, or None if none are found"""
+        print(f"Scanning the top {self.header_band:.0%} of each page for chapter headings...")
+        chapter_starts = self.find_header_chapter_starts()
+        if not chapter_starts:
+            print("No chapter headings found in page headers.")
+            return None
+        
+        print(f"Found {len(chapter_starts)} chapters in page headers:")
+        for i, (start_page, title) in enumerate(chapter_starts):
+            print(f"  {i:02d}: {title} (page {start_page + 1})")
+        return self._pages_from_chapter_starts(chapter_starts)
+    
+    def _detect_targeted(self) -> Optional[List[Tuple[int, int, str]]]:
+        """Chapter page ranges from strategies that avoid a full text scan, or None"""
+        strategies = {"outline": self._detect_from_outline, "toc": self._detect_from_toc,
+                      "header": self._detect_from_header}
+        names = ("outline", "toc") if self.detection == "auto" else (self.detection,)
+        for name in names:
+            if name not in strategies:
+                continue
+            with self.metrics.stage(f"detect:{name}") as stage:
+                chapter_pages = strategies[name]()
+                stage.pages = self.document.decoded_page_count
+            if chapter_pages is not None:
+                self.detection_method = name
+                return chapter_pages
+            if self.detection == name:
+                raise ValueError(f"Chapter detection by {name} failed for this PDF")
+        return None
+    
+    def _detect_from_text(self) -> List[Tuple[int, int, str]]:
+        """Chapter page ranges from headings in the extracted text"""
+        self.detection_method = "text"
+        self.front_matter_estimated = False
+        # Extract text (one pass also yields the line offset of each page)
+        with self.metrics.stage("extract", pages=self.document.page_count):
+            extracted = self.extract_pages()
         
         # Find chapter boundaries
-        chapter_boundaries = self.find_chapter_boundaries(text)
+        with self.metrics.stage("detect:text", pages=self.document.page_count):
+            chapter_boundaries = self.find_chapter_boundaries(extracted)
         
         if not chapter_boundaries:
-            print("No chapter breaks found. Saving entire document as one file.")
-            with open(self.pdf_path, 'rb') as file:
-                reader = PdfReader(file, strict=False)
-                last_page = len(reader.pages) - 1
-            output_path = self.split_pdf_by_pages(0, last_page, "000.pdf")
-            return [output_path]
+            return []
         
+        with self.metrics.stage("page_mapping"):
+            return self._map_text_chapters(chapter_boundaries, extracted)
+    
+    def _map_text_chapters(self, chapter_boundaries: List[Tuple[int, str]],
+                           extracted: ExtractedText) -> List[Tuple[int, int, str]]:
+        """Page ranges (with front matter) for text-detected chapter boundaries"""
         print(f"Found {len(chapter_boundaries)} chapters:")
         for i, (_, title) in enumerate(chapter_boundaries):
             print(f"  {i:02d}: {title}")
         
         # Calculate page range for each chapter
-        chapter_pages = self.find_chapter_pages(chapter_boundaries)
+        chapter_pages = self.find_chapter_pages(chapter_boundaries, extracted)
         
         # Add content before first chapter as 000.pdf
         if chapter_pages:
@@ -299,25 +620,216 @@ class PDFChapterSplitter:
                         chapter_pages[0] = (estimated_front_matter_pages, chapter_pages[0][1], chapter_pages[0][2])
                         # Add preface
                         chapter_pages.insert(0, (0, estimated_front_matter_pages - 1, "Preface・Table of Contents"))
+                        self.front_matter_estimated = True
                         print(f"Estimated: Saving preface・table of contents as 000.pdf (pages 1-{estimated_front_matter_pages})")
-        # If no chapters found, entire document is already processed as 000.pdf
+        return chapter_pages
+    
+    def detect_chapter_pages(self) -> List[Tuple[int, int, str]]:
+        """Page range for each output file according to the detection mode"""
+        chapter_pages = self._detect_targeted()
+        if chapter_pages is not None:
+            return chapter_pages
+        if self.detection != "text":
+            print("Falling back to text-based chapter detection.")
+        return self._detect_from_text()
+    
+    def iter_streamed_chapters(self, pages: Iterable[Tuple[int, Optional[str]]]) -> Iterable[Tuple[int, int, str]]:
+        """Yield each chapter's page range as soon as the next heading is seen
 
+        Works page by page: a chapter starts on the page holding its heading
+        and ends on the page before the next one.  Pages before the first
+        heading form the preface.
+        """
+        seen_chapters = {}
+        current_start, current_title = 0, "Preface・Table of Contents"
+        last_page = -1
+        for page_num, page_text in pages:
+            last_page = page_num
+            if page_text is None:
+                continue
+            for line in page_text.split('\n'):
+                line = line.strip()
+                heading = self._match_chapter_start(line, seen_chapters)
+                if heading is None:
+                    continue
+                seen_chapters[heading.number] = heading.explicit
+                print(f"Detected chapter {heading.number}: page {page_num + 1} - {line}")
+                if page_num > current_start:
+                    yield current_start, page_num - 1, current_title
+                    current_start = page_num
+                # A heading on the same page as the chapter start only renames it
+                current_title = line
+                break
+        if last_page >= current_start:
+            yield current_start, last_page, current_title
+    
+    def _split_streaming(self) -> List[Path]:
+        """Detect and write chapters while pages are extracted one at a time
+
+        Page text is not retained, and each chapter is written as soon as the
+        following heading appears, so memory holds about one chapter's pages.
+        """
+        chapter_pages = self._detect_targeted()
+        if chapter_pages is not None:
+            return self._write_chapter_pages(chapter_pages)
+        if self.detection != "text":
+            print("Falling back to streaming text-based chapter detection.")
+        
+        self.detection_method = "text"
+        print(f"PDF page count: {self.document.page_count}")
+        writer = ChapterWriter(self.document.reader, self.output_dir, optimize=self.optimize,
+                                   measure_savings=self.measure_savings)
+        self.write_results = []
+        with self.metrics.stage("stream", pages=self.document.page_count) as stage:
+            chapters = self.iter_streamed_chapters(self.document.iter_page_texts())
+            for i, (start_page, end_page, title) in enumerate(chapters):
+                output_filename = f"{i:03d}.pdf"
+                print(f"Saving chapter {i:02d} (pages {start_page+1}-{end_page+1}, {end_page - start_page + 1} pages) to '{output_filename}'...")
+                print(f"  Title: {title[:60]}{'...' if len(title) > 60 else ''}")
+                result = writer.write_chapter(start_page, end_page, output_filename)
+                self._print_write(result)
+                self._record_write(result)
+                self.write_results.append(result)
+            stage.output_bytes = sum(result.bytes_written for result in self.write_results)
+        
+        output_files = [result.path for result in self.write_results]
+        print(f"\nSplitting complete! {len(output_files)} files saved to '{self.output_dir}'.")
+        return output_files
+    
+    @property
+    def document_title(self) -> str:
+        """Title for a whole-document output when no chapters are found"""
+        return self.pdf_path.stem if self.pdf_path is not None else "document"
+    
+    def _prepare_output_dir(self):
+        if self.output_dir is None:
+            raise ValueError("output_dir is required to write files from an in-memory PDF")
+        self.output_dir.mkdir(exist_ok=True)
+    
+    def iter_chapter_buffers(self) -> Iterator[ChapterBuffer]:
+        """Detect chapters and yield each one as in-memory PDF bytes once rendered
+        
+        Nothing is written to disk.  Streaming and incremental modes do not
+        apply; the output directory is not used.
+        """
+        self.metrics = RunMetrics(self.on_stage, self.profile_dir)
+        rendered = 0
+        try:
+            print(f"Analyzing PDF file '{self.document.name}'...")
+            with self.metrics.stage("open") as stage:
+                stage.pages = self.document.page_count
+            
+            chapter_pages = self.detect_chapter_pages()
+            if not chapter_pages:
+                print("No chapter breaks found. Returning entire document as one buffer.")
+                chapter_pages = [(0, self.document.page_count - 1, self.document_title)]
+            
+            writer = ChapterWriter(self.document.reader, optimize=self.optimize)
+            for i, (start_page, end_page, title) in enumerate(chapter_pages):
+                filename = f"{i:03d}.pdf"
+                with self.metrics.stage(f"write:{filename}", pages=end_page - start_page + 1) as stage:
+                    data = writer.render_chapter(start_page, end_page)
+                    stage.output_bytes = len(data)
+                rendered += 1
+                yield ChapterBuffer(filename, start_page, end_page, title, data)
+        finally:
+            self._finish_run(rendered)
+    
+    def _split(self) -> List[Path]:
+        print(f"Analyzing PDF file '{self.document.name}'...")
+        self._prepare_output_dir()
+        
+        with self.metrics.stage("open") as stage:
+            stage.pages = self.document.page_count
+        
+        if not self.incremental:
+            # Outputs are about to be rewritten, so any recorded state is void
+            IncrementalState.discard(self.output_dir)
+        
+        if self.streaming:
+            return self._split_streaming()
+        
+        chapter_pages = self.detect_chapter_pages()
+        
+        if not chapter_pages and self.incremental:
+            print("No chapter breaks found. Saving entire document as one file.")
+            return self._write_chapter_pages([(0, self.document.page_count - 1, self.document_title)])
+        
+        if not chapter_pages:
+            print("No chapter breaks found. Saving entire document as one file.")
+            last_page = self.document.page_count - 1
+            with self.metrics.stage("write:000.pdf", pages=last_page + 1) as stage:
+                output_path = self.split_pdf_by_pages(0, last_page, "000.pdf")
+                stage.output_bytes = output_path.stat().st_size
+            return [output_path]
+        
+        return self._write_chapter_pages(chapter_pages)
+    
+    def _print_write(self, result: ChapterWriteResult):
+        message = f"  Wrote '{result.path.name}': {result.bytes_written:,} bytes in {result.seconds:.2f}s"
+        if result.bytes_saved is not None:
+            message += f" (saved {result.bytes_saved:,} bytes, optimized in {result.optimize_seconds:.2f}s)"
+        elif self.optimize:
+            message += f" (optimized in {result.optimize_seconds:.2f}s)"
+        print(message)
+    
+    def _record_write(self, result: ChapterWriteResult):
+        """Add a per-file write stage to the run metrics"""
+        extra = {"optimize_seconds": result.optimize_seconds} if self.optimize else {}
+        if result.bytes_saved is not None:
+            extra["bytes_saved"] = result.bytes_saved
+        self.metrics.add(StageMetrics(f"write:{result.path.name}", result.seconds, result.cpu_seconds,
+                                      result.page_count, result.bytes_written, extra, max_rss_bytes=peak_rss_bytes()))
+    
+    def _write_chapter_pages(self, chapter_pages: List[Tuple[int, int, str]]) -> List[Path]:
         # Split each chapter into PDF files
-        output_files = []
         for i, (start_page, end_page, title) in enumerate(chapter_pages):
             output_filename = f"{i:03d}.pdf"
             page_count = end_page - start_page + 1
             print(f"Saving chapter {i:02d} (pages {start_page+1}-{end_page+1}, {page_count} pages) to '{output_filename}'...")
             print(f"  Title: {title[:60]}{'...' if len(title) > 60 else ''}")
-            
-            output_path = self.split_pdf_by_pages(start_page, end_page, output_filename)
-            output_files.append(output_path)
+        
+        with self.metrics.stage("write") as stage:
+            results = self.write_chapters(chapter_pages)
+            for result in results:
+                self._record_write(result)
+            stage.pages = sum(result.page_count for result in results)
+            stage.output_bytes = sum(result.bytes_written for result in results)
+        # Unchanged outputs skipped in incremental mode are still part of the split
+        output_files = [self.output_dir / f"{i:03d}.pdf" for i in range(len(chapter_pages))]
         
         print(f"\nSplitting complete! {len(output_files)} files saved to '{self.output_dir}'.")
         return output_files
 
 
-def split_pdf_chapters(pdf_path: str, output_dir: Optional[str] = None) -> List[Path]:
-    """Function to split PDF by chapters"""
-    splitter = PDFChapterSplitter(pdf_path, output_dir)
+def split_pdf_chapters(pdf_path: PDFSource, output_dir: Optional[str] = None, plan_only: bool = False,
+                       **options) -> Union[List[Path], SplitPlan]:
+    """Function to split PDF by chapters
+
+    Keyword options (detection, jobs, write_workers, cache_dir,
+    cache_max_bytes, chapter_range, streaming, header_band,
+    rank_by_font_size, incremental, optimize, measure_savings, use_mmap,
+    page_timeout, document_timeout) are passed to
+    PDFChapterSplitter.  With plan_only, no PDF is written: the chapter
+    plan is saved as chapters.json in the output directory and returned.
+    """
+    splitter = PDFChapterSplitter(pdf_path, output_dir, **options)
+    if plan_only:
+        plan = splitter.plan()
+        splitter._prepare_output_dir()
+        plan.write_json(splitter.output_dir / MANIFEST_FILENAME)
+        return plan
     return splitter.split()
+
+
+def iter_pdf_chapter_buffers(source: PDFSource, **options) -> Iterator[ChapterBuffer]:
+    """Split a PDF (path, bytes or binary stream), yielding each chapter in memory as it is rendered
+
+    Keyword options are passed to PDFChapterSplitter; no file is written.
+    """
+    yield from PDFChapterSplitter(source, **options).iter_chapter_buffers()
+
+
+def split_pdf_to_buffers(source: PDFSource, **options) -> List[ChapterBuffer]:
+    """Split a PDF (path, bytes or binary stream) into in-memory chapter PDFs"""
+    return list(iter_pdf_chapter_buffers(source, **options))
@@ -0,0 +1,54 @@
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Type
+
+
+class JobTimeout(BaseException):
+    """Raised inside a time_limit block whose time has run out
+
+    Like KeyboardInterrupt it is not an Exception, so the ``except
+    Exception`` handlers around page decoding cannot swallow it.
+    """
+
+
+def alarm_available() -> bool:
+    """Whether SIGALRM can interrupt work here (Unix, main thread only)"""
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def time_limit(seconds: Optional[float], message: str = "Time limit exceeded",
+               error: Type[JobTimeout] = JobTimeout) -> Iterator[None]:
+    """Raise ``error`` in the block once ``seconds`` of wall time have passed
+
+    Uses a real-time interval timer, so it only interrupts Python code of
+    the main thread; elsewhere, or when ``seconds`` is None, the block runs
+    unlimited.  An enclosing limit that expires sooner stays in charge, and
+    is re-armed with its remaining time when the block ends.
+    """
+    if not seconds or not alarm_available():
+        yield
+        return
+
+    now = time.monotonic()
+    outer_remaining, _ = signal.getitimer(signal.ITIMER_REAL)
+    if outer_remaining and outer_remaining <= seconds:
+        yield
+        return
+
+    def expire(signum, frame):
+        raise error(f"{message} ({seconds:g}s)")
+
+    previous_handler = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        if outer_remaining:
+            # Fire the enclosing limit right away if it has already passed
+            left = outer_remaining - (time.monotonic() - now)
+            signal.setitimer(signal.ITIMER_REAL, max(left, 1e-6))
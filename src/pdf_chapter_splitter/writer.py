@@ -0,0 +1,227 @@
+import io
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.generic import DictionaryObject, NameObject
+
+
+# Resource categories whose entries content streams refer to by name
+PRUNABLE_RESOURCES = ("/Font", "/XObject", "/ExtGState", "/ColorSpace", "/Pattern", "/Shading")
+# Flate overhead outweighs the gain on smaller content streams
+MIN_COMPRESS_BYTES = 256
+NAME_TOKEN_PATTERN = re.compile(rb'/([^\s/\[\]()<>{}%]+)')
+
+
+@dataclass
+class ChapterWriteResult:
+    """Outcome of writing one chapter file"""
+    path: Path
+    start_page: int
+    end_page: int
+    bytes_written: int
+    seconds: float
+    cpu_seconds: float = 0.0
+    # Set when the output was optimized: time spent on it and, when savings
+    # are measured, the size reduction
+    bytes_saved: Optional[int] = None
+    optimize_seconds: float = 0.0
+
+    @property
+    def page_count(self) -> int:
+        return self.end_page - self.start_page + 1
+
+
+def build_writer(reader: PdfReader, start_page: int, end_page: int) -> PdfWriter:
+    """Copy the page range [start_page, end_page] into a new writer"""
+    writer = PdfWriter()
+    for page_num in range(start_page, min(end_page + 1, len(reader.pages))):
+        try:
+            writer.add_page(reader.pages[page_num])
+        except Exception as e:
+            print(f"Warning: Error adding page {page_num+1}: {e}")
+            continue
+    return writer
+
+
+@dataclass
+class ChapterBuffer:
+    """One chapter rendered in memory instead of to a file"""
+    filename: str
+    start_page: int
+    end_page: int
+    title: str
+    data: bytes
+
+    @property
+    def page_count(self) -> int:
+        return self.end_page - self.start_page + 1
+
+
+class _ByteCounter:
+    """Write-only stream that just counts bytes, for measuring an unoptimized size"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.size
+
+    def flush(self):
+        pass
+
+
+def used_resource_names(page: PageObject) -> Optional[Set[str]]:
+    """Names referenced by a page's content streams (None if they cannot be read)"""
+    try:
+        contents = page.get_contents()
+        data = contents.get_data() if contents is not None else b""
+    except Exception:
+        return None
+    names = {"/" + name.decode("latin-1") for name in NAME_TOKEN_PATTERN.findall(data)}
+    # Escaped names (#xx) would need decoding to compare; leave such pages alone
+    if any("#" in name for name in names):
+        return None
+    return names
+
+
+def prune_resources(page: PageObject) -> int:
+    """Drop resources the page's content never uses; returns the number removed
+
+    The page gets its own copy of the resource dictionary, since the original
+    may be shared with other pages.  Pages drawing form XObjects that inherit
+    the page resources are left untouched.
+    """
+    if "/Resources" not in page:
+        return 0
+    used = used_resource_names(page)
+    if used is None:
+        return 0
+    resources = page["/Resources"].get_object()
+    
+    for name in used:
+        xobjects = resources.get("/XObject")
+        xobject = xobjects.get_object().get(name) if xobjects is not None else None
+        if xobject is not None:
+            xobject = xobject.get_object()
+            if xobject.get("/Subtype") == "/Form" and "/Resources" not in xobject:
+                return 0
+    
+    pruned = DictionaryObject({key: resources.raw_get(key) for key in resources})
+    removed = 0
+    for category in PRUNABLE_RESOURCES:
+        entries = pruned.get(category)
+        entries = entries.get_object() if entries is not None else None
+        if not isinstance(entries, DictionaryObject):
+            continue
+        kept = DictionaryObject({key: entries.raw_get(key) for key in entries if key in used})
+        removed += len(entries) - len(kept)
+        pruned[NameObject(category)] = kept
+    if removed:
+        page[NameObject("/Resources")] = pruned
+    return removed
+
+
+def optimize_writer(writer: PdfWriter):
+    """Shrink a chapter before it is written
+
+    Prunes unused page resources, Flate-compresses content streams of at
+    least MIN_COMPRESS_BYTES, and merges identical objects while dropping
+    unreferenced ones.
+    """
+    for page_num, page in enumerate(writer.pages):
+        try:
+            prune_resources(page)
+            contents = page.get_contents()
+            if contents is not None and len(contents.get_data()) >= MIN_COMPRESS_BYTES:
+                page.compress_content_streams()
+        except Exception as e:
+            print(f"Warning: Could not optimize page {page_num+1}: {e}")
+    writer.compress_identical_objects(remove_duplicates=True, remove_unreferenced=True)
+
+
+class ChapterWriter:
+    """Write every chapter of a split from one shared reader
+
+    Copying pages reads from the shared reader's stream, so it is serialized
+    with a lock; serializing and writing each output file runs concurrently
+    on ``workers`` threads.  With ``optimize``, each file is shrunk by
+    ``optimize_writer``; ``measure_savings`` also serializes it unoptimized
+    to record the bytes saved, which costs a second full write (counted in
+    ``optimize_seconds``).
+    """
+
+    def __init__(self, reader: PdfReader, output_dir: Optional[Path] = None, workers: int = 1,
+                 optimize: bool = False, measure_savings: bool = False):
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        self.reader = reader
+        # Only needed for writing files; render_chapter works without it
+        self.output_dir = Path(output_dir) if output_dir is not None else None
+        self.workers = workers
+        self.optimize = optimize
+        self.measure_savings = measure_savings
+        self._reader_lock = threading.Lock()
+
+    def _build(self, start_page: int, end_page: int) -> Tuple[PdfWriter, int, float]:
+        """Writer for a page range, optimized if configured
+
+        Returns the writer, its unoptimized size (None unless savings are
+        measured) and the seconds spent optimizing.
+        """
+        with self._reader_lock:
+            writer = build_writer(self.reader, start_page, end_page)
+        
+        unoptimized_size, optimize_seconds = None, 0.0
+        if self.optimize:
+            optimize_started = time.perf_counter()
+            if self.measure_savings:
+                counter = _ByteCounter()
+                writer.write(counter)
+                unoptimized_size = counter.size
+            optimize_writer(writer)
+            optimize_seconds = time.perf_counter() - optimize_started
+        return writer, unoptimized_size, optimize_seconds
+
+    def render_chapter(self, start_page: int, end_page: int) -> bytes:
+        """One page range as PDF bytes, without touching the filesystem"""
+        writer, _, _ = self._build(start_page, end_page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    def write_chapter(self, start_page: int, end_page: int, output_filename: str) -> ChapterWriteResult:
+        """Write one page range to output_dir/output_filename"""
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        writer, unoptimized_size, optimize_seconds = self._build(start_page, end_page)
+        
+        output_path = self.output_dir / output_filename
+        with open(output_path, 'wb') as output_file:
+            writer.write(output_file)
+        
+        size = output_path.stat().st_size
+        return ChapterWriteResult(output_path, start_page, end_page, size,
+                                  time.perf_counter() - started, time.thread_time() - cpu_started,
+                                  unoptimized_size - size if unoptimized_size is not None else None,
+                                  optimize_seconds)
+
+    def write_all(self, chapter_pages: List[Tuple[int, int, str]]) -> List[ChapterWriteResult]:
+        """Write chapter i to NNN.pdf for every (start, end, title) entry"""
+        return self.write_files([(start_page, end_page, f"{i:03d}.pdf")
+                                 for i, (start_page, end_page, _) in enumerate(chapter_pages)])
+
+    def write_files(self, jobs: List[Tuple[int, int, str]]) -> List[ChapterWriteResult]:
+        """Write every (start, end, filename) page range, in the given order"""
+        if self.workers == 1 or len(jobs) < 2:
+            return [self.write_chapter(*job) for job in jobs]
+        
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs))) as executor:
+            return list(executor.map(lambda job: self.write_chapter(*job), jobs))
@@ -0,0 +1,24 @@
+import pytest
+from pathlib import Path
+from typing import List, Optional
+from pypdf import PdfWriter
+from .pdf_builder import build_pdf
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Factory writing a text PDF into the test's temporary directory"""
+    def _make(pages: List[str], name: str = "book.pdf", font_sizes: Optional[List[float]] = None) -> Path:
+        return build_pdf(tmp_path / name, pages, font_sizes)
+    return _make
+
+
+def add_outline(path: Path, bookmarks: List[tuple]) -> Path:
+    """Rewrite a PDF with top-level bookmarks given as (title, page index)"""
+    from pypdf import PdfReader
+    writer = PdfWriter(clone_from=PdfReader(path))
+    for title, page_index in bookmarks:
+        writer.add_outline_item(title, page_index)
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return path
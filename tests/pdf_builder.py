@@ -0,0 +1,102 @@
+"""Synthetic text PDFs shared by the tests and the benchmark corpus
+
+Every page is a plain text content stream.  Latin-1 text is drawn with
+Helvetica; any other text uses a Type0 font with Identity-H encoding and a
+ToUnicode CMap so that pypdf extracts it back as Unicode.
+"""
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+from pypdf import PdfWriter
+from pypdf.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, NameObject,
+                           NumberObject, TextStringObject)
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _helvetica(writer: PdfWriter):
+    return writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    }))
+
+
+def _to_unicode_cmap(code_points: Iterable[int]) -> bytes:
+    lines = [
+        "/CIDInit /ProcSet findresource begin", "12 dict begin", "begincmap",
+        "/CMapName /Synthetic-UCS def", "/CMapType 2 def",
+        "1 begincodespacerange", "<0000> <FFFF>", "endcodespacerange",
+    ]
+    code_points = sorted(set(code_points))
+    for start in range(0, len(code_points), 100):
+        block = code_points[start:start + 100]
+        lines.append(f"{len(block)} beginbfchar")
+        lines.extend(f"<{cp:04X}> <{cp:04X}>" for cp in block)
+        lines.append("endbfchar")
+    lines += ["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+    return "\n".join(lines).encode('ascii')
+
+
+def _unicode_font(writer: PdfWriter, code_points: Iterable[int]):
+    """Type0 font whose character codes are the BMP code points themselves"""
+    to_unicode = DecodedStreamObject()
+    to_unicode.set_data(_to_unicode_cmap(code_points))
+    descendant = writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/CIDFontType2'),
+        NameObject('/BaseFont'): NameObject('/SyntheticGothic'),
+        NameObject('/CIDSystemInfo'): DictionaryObject({
+            NameObject('/Registry'): TextStringObject('Adobe'),
+            NameObject('/Ordering'): TextStringObject('Identity'),
+            NameObject('/Supplement'): NumberObject(0),
+        }),
+        NameObject('/DW'): NumberObject(1000),
+    }))
+    return writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type0'),
+        NameObject('/BaseFont'): NameObject('/SyntheticGothic'),
+        NameObject('/Encoding'): NameObject('/Identity-H'),
+        NameObject('/DescendantFonts'): ArrayObject([descendant]),
+        NameObject('/ToUnicode'): writer._add_object(to_unicode),
+    }))
+
+
+def build_pdf(path: Path, pages: Sequence[str], font_sizes: Optional[List[float]] = None,
+              outline: Optional[List[Tuple[str, int]]] = None) -> Path:
+    """Write a PDF whose pages contain the given lines of text
+
+    Lines are set in 12pt unless ``font_sizes`` gives a size per page.
+    ``outline`` adds top-level bookmarks given as (title, page index).
+    """
+    writer = PdfWriter()
+    code_points = {ord(ch) for page in pages for ch in page if ch != '\n'}
+    unicode_text = any(cp > 0xFF for cp in code_points)
+    if any(cp > 0xFFFF for cp in code_points):
+        raise ValueError("Only Basic Multilingual Plane characters are supported")
+    font = _unicode_font(writer, code_points) if unicode_text else _helvetica(writer)
+
+    for page_num, page_text in enumerate(pages):
+        page = writer.add_blank_page(width=612, height=792)
+        font_size = font_sizes[page_num] if font_sizes else 12
+        commands = ['BT', f'/F1 {font_size} Tf', f'{font_size + 2} TL', '72 720 Td']
+        for line in page_text.split('\n'):
+            if unicode_text:
+                commands.append(f"<{''.join(f'{ord(ch):04X}' for ch in line)}> Tj T*")
+            else:
+                commands.append(f'({_escape(line)}) Tj T*')
+        commands.append('ET')
+        stream = DecodedStreamObject()
+        stream.set_data('\n'.join(commands).encode('latin-1'))
+        page[NameObject('/Contents')] = writer._add_object(stream)
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): font}),
+        })
+
+    for title, page_index in outline or []:
+        writer.add_outline_item(title, page_index)
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return path
@@ -0,0 +1,81 @@
+import json
+import pytest
+from click.testing import CliRunner
+from pdf_chapter_splitter.batch import collect_inputs, output_dirs, run_batch, schedule, write_summary
+from pdf_chapter_splitter.cli import main
+
+
+@pytest.fixture
+def library(make_pdf, tmp_path):
+    """Two readable books and one corrupt file"""
+    make_pdf(["Page 1"], name="small.pdf")
+    make_pdf([f"Page {i + 1}" for i in range(5)], name="large.pdf")
+    (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+    return tmp_path
+
+
+class TestCollectInputs:
+    def test_directory(self, library):
+        """Test a directory yields every PDF inside it"""
+        assert [p.name for p in collect_inputs(str(library))] == ["broken.pdf", "large.pdf", "small.pdf"]
+    
+    def test_glob(self, library):
+        """Test a glob pattern is expanded"""
+        assert [p.name for p in collect_inputs(str(library / "*l*.pdf"))] == ["large.pdf", "small.pdf"]
+    
+    def test_manifests(self, library):
+        """Test plain and JSONL manifests resolve relative paths"""
+        (library / "books.txt").write_text("# nightly\nsmall.pdf\n\nlarge.pdf\n")
+        (library / "books.jsonl").write_text(json.dumps({"path": "large.pdf"}) + "\n")
+        
+        assert collect_inputs(str(library / "books.txt")) == [library / "small.pdf", library / "large.pdf"]
+        assert collect_inputs(str(library / "books.jsonl")) == [library / "large.pdf"]
+
+
+def test_schedule_largest_first(library):
+    """Test books are ordered by decreasing size"""
+    ordered = schedule([library / "small.pdf", library / "broken.pdf", library / "large.pdf"])
+    assert [p.name for p in ordered] == ["large.pdf", "small.pdf", "broken.pdf"]
+
+
+def test_output_dirs_are_unique(tmp_path):
+    """Test books sharing a stem get distinct output directories"""
+    dirs = output_dirs([tmp_path / "a" / "book.pdf", tmp_path / "b" / "book.pdf"], tmp_path / "out")
+    assert sorted(d.name for d in dirs.values()) == ["book", "book_1"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_survives_failures(library, tmp_path, workers):
+    """Test a broken book is reported without aborting the others"""
+    results = run_batch(collect_inputs(str(library)), tmp_path / "out", workers=workers,
+                        options={'detection': 'text'})
+    by_name = {r.pdf_path.rsplit("/", 1)[-1]: r for r in results}
+    
+    assert by_name["broken.pdf"].status == "failed"
+    assert by_name["broken.pdf"].error
+    assert by_name["large.pdf"].status == "ok"
+    assert by_name["large.pdf"].page_count == 5
+    assert by_name["small.pdf"].chapter_count == 1
+    
+    summary = write_summary(results, tmp_path / "summary.csv").read_text()
+    assert summary.splitlines()[0].startswith("pdf_path,output_dir,status,seconds,page_count")
+
+
+class TestCli:
+    def test_single_file_is_default_command(self, make_pdf, tmp_path):
+        """Test the plain `pdf-chapter-splitter FILE` form still works"""
+        pdf_path = make_pdf(["Page 1"])
+        result = CliRunner().invoke(main, [str(pdf_path), "-o", str(tmp_path / "out"), "--detection", "text", "--no-cache"])
+        
+        assert result.exit_code == 0, result.output
+        assert (tmp_path / "out" / "000.pdf").exists()
+    
+    def test_batch_command(self, library, tmp_path):
+        """Test batch writes per-book outputs and a summary"""
+        out = tmp_path / "batch_out"
+        result = CliRunner().invoke(main, ["batch", str(library / "*l*.pdf"), "-o", str(out), "--no-cache"])
+        
+        assert result.exit_code == 0, result.output
+        assert (out / "large" / "000.pdf").exists()
+        assert (out / "batch_summary.csv").exists()
+        assert "2 books, 0 failed" in result.output
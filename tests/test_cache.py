@@ -0,0 +1,82 @@
+import os
+from unittest.mock import patch
+from pypdf import PageObject
+from pdf_chapter_splitter.cache import ExtractionCache
+from pdf_chapter_splitter.document import PDFDocument
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+
+
+class TestExtractionCache:
+    def test_round_trip(self, tmp_path):
+        """Test stored page texts come back unchanged"""
+        cache = ExtractionCache(str(tmp_path / "cache"))
+        cache.put("key", ["第1章 はじめに", None, ""])
+        
+        assert cache.get("key") == ["第1章 はじめに", None, ""]
+        assert cache.get("other") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_key_depends_on_content(self, make_pdf):
+        """Test the key changes with the PDF bytes, not the path"""
+        first = make_pdf(["Page 1"], name="a.pdf")
+        same = make_pdf(["Page 1"], name="b.pdf")
+        different = make_pdf(["Page 2"], name="c.pdf")
+        
+        assert ExtractionCache.key_for(str(first)) == ExtractionCache.key_for(str(same))
+        assert ExtractionCache.key_for(str(first)) != ExtractionCache.key_for(str(different))
+    
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test the oldest entries go first once over the size cap"""
+        cache = ExtractionCache(str(tmp_path), max_bytes=10**9)
+        for i, key in enumerate(["old", "used", "new"]):
+            cache.put(key, ["x" * 1000])
+            os.utime(cache._entry_path(key), (i, i))
+        cache.get("used")
+        
+        cache.max_bytes = cache._entry_path("new").stat().st_size * 2
+        cache.evict()
+        
+        assert cache.get("old") is None
+        assert cache.get("used") is not None
+        assert cache.get("new") is not None
+
+
+def test_warm_run_skips_extraction(make_pdf, tmp_path):
+    """Test a second run takes every page from the cache"""
+    pdf_path = make_pdf(["Page 1\nline", "Page 2"])
+    cache_dir = tmp_path / "cache"
+    
+    with PDFDocument(str(pdf_path), cache=ExtractionCache(str(cache_dir))) as document:
+        cold = document.extract_pages()
+    
+    splitter = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"), cache_dir=str(cache_dir))
+    with patch.object(PageObject, 'extract_text', side_effect=AssertionError("decoded")):
+        assert splitter.get_page_breaks() == cold.page_breaks
+        assert splitter.extract_text() == cold.text
+    assert splitter.document.cache.hits == 1
+    splitter.document.close()
+
+
+def test_warm_auto_run_skips_decoding(make_pdf, tmp_path):
+    """Test a warm run with auto detection reads the TOC pages from the cache too"""
+    toc = "Contents\nChapter 1 Getting Started ........ 1\nChapter 2 Data Structures ........ 6"
+    pages = ["Title page", toc, "Preface"] + ["Body text"] * 17
+    pages[3] = "Chapter 1 Getting Started\nBody text"
+    pages[8] = "Chapter 2 Data Structures\nBody text"
+    pdf_path = make_pdf(pages)
+    cache_dir = str(tmp_path / "cache")
+    
+    cold = PDFChapterSplitter(str(pdf_path), str(tmp_path / "cold"), cache_dir=cache_dir)
+    cold_files = cold.split()
+    assert cold.detection_method == "toc"
+    # TOC detection only decodes a few pages; fill the cache with a full extraction
+    with PDFDocument(str(pdf_path), cache=ExtractionCache(cache_dir)) as document:
+        document.extract_pages()
+    
+    warm = PDFChapterSplitter(str(pdf_path), str(tmp_path / "warm"), cache_dir=cache_dir)
+    with patch.object(PageObject, 'extract_text', autospec=True) as mock_extract:
+        warm_files = warm.split()
+    
+    assert mock_extract.call_count == 0
+    assert warm.detection_method == "toc"
+    assert [f.name for f in warm_files] == [f.name for f in cold_files]
@@ -0,0 +1,251 @@
+import mmap
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from pypdf import PageObject
+from pdf_chapter_splitter.cache import ExtractionCache
+from pdf_chapter_splitter.document import (ExtractedText, ExtractionBudget, LinePageIndex, PDFDocument,
+                                           _extract_page_shard, open_input, resolve_jobs)
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+
+
+class TestPDFDocument:
+    def test_opens_lazily_once(self, make_pdf):
+        """Test the file is parsed once however often it is queried"""
+        document = PDFDocument(str(make_pdf(["Page 1", "Page 2", "Page 3"])))
+        assert document.open_count == 0
+        
+        assert document.page_count == 3
+        assert document.page_text(1).strip() == "Page 2"
+        assert document.page_count == 3
+        
+        assert document.open_count == 1
+        document.close()
+    
+    def test_page_text_is_cached(self, make_pdf):
+        """Test each page is extracted only once"""
+        document = PDFDocument(str(make_pdf(["Page 1", "Page 2"])))
+        with patch.object(PageObject, 'extract_text', autospec=True, return_value="text") as mock_extract:
+            for _ in range(3):
+                document.page_text(0)
+                document.page_text(1)
+        
+        assert mock_extract.call_count == 2
+        document.close()
+    
+    def test_unreadable_page_returns_none(self, make_pdf):
+        """Test a failing page is recorded as None"""
+        document = PDFDocument(str(make_pdf(["Page 1"])))
+        with patch.object(PageObject, 'extract_text', side_effect=ValueError("broken")):
+            assert document.page_text(0) is None
+        document.close()
+    
+    def test_reopens_after_close(self, make_pdf):
+        """Test closing releases the reader but keeps extracted text"""
+        with PDFDocument(str(make_pdf(["Page 1"]))) as document:
+            text = document.page_text(0)
+        
+        assert document.page_text(0) == text
+        assert document.open_count == 1
+        assert document.page_count == 1
+        assert document.open_count == 2
+        document.close()
+
+
+def test_split_parses_pdf_once(make_pdf, tmp_path):
+    """Test a whole split run opens the source only once"""
+    pdf_path = make_pdf(["Front matter"] + [f"Body page {i}" for i in range(4)])
+    splitter = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"))
+    
+    with patch.object(splitter, 'find_chapter_boundaries', return_value=[]):
+        output_files = splitter.split()
+    
+    assert len(output_files) == 1
+    assert splitter.document.open_count == 1
+
+
+class TestMemoryMappedInput:
+    def test_open_input_maps_file(self, make_pdf, tmp_path):
+        """Test files are mapped read-only and empty files fall back to a plain handle"""
+        with open_input(make_pdf(["Page 1"]), use_mmap=True) as mapped:
+            assert isinstance(mapped, mmap.mmap)
+            assert mapped[:5] == b"%PDF-"
+        empty = tmp_path / "empty.pdf"
+        empty.write_bytes(b"")
+        with open_input(empty, use_mmap=True) as file:
+            assert not isinstance(file, mmap.mmap)
+    
+    def test_matches_file_reads(self, make_pdf):
+        """Test mapped input extracts the same text, sequentially and in workers"""
+        pdf_path = make_pdf([f"Page {i + 1}\nline" for i in range(6)])
+        with PDFDocument(str(pdf_path)) as plain, PDFDocument(str(pdf_path), use_mmap=True) as mapped, \
+                PDFDocument(str(pdf_path), jobs=2, use_mmap=True) as parallel:
+            assert mapped.extract_pages() == plain.extract_pages()
+            assert parallel.extract_pages() == plain.extract_pages()
+            assert isinstance(mapped._file, mmap.mmap)
+        assert mapped._file is None
+    
+    def test_split_with_mmap(self, make_pdf, tmp_path):
+        """Test a whole split reads and writes chapters from the mapping"""
+        pdf_path = make_pdf(["Preface", "Chapter 1 Getting Started", "Body", "Chapter 2 Data Structures"])
+        expected = PDFChapterSplitter(str(pdf_path), str(tmp_path / "plain")).split()
+        output_files = PDFChapterSplitter(str(pdf_path), str(tmp_path / "mapped"), use_mmap=True).split()
+        
+        assert [f.name for f in output_files] == [f.name for f in expected]
+        assert [f.read_bytes() for f in output_files] == [f.read_bytes() for f in expected]
+
+
+def slow_pages(*slow, seconds=2):
+    """extract_text replacement that hangs on the given page numbers"""
+    original = PageObject.extract_text
+    
+    def extract_text(page, *args, **kwargs):
+        if page.page_number in slow:
+            time.sleep(seconds)
+        return original(page, *args, **kwargs)
+    return patch.object(PageObject, 'extract_text', autospec=True, side_effect=extract_text)
+
+
+class TestExtractionBudget:
+    def test_page_timeout_aborts_page(self, make_pdf, capsys):
+        """Test a runaway page is cut short, recorded as empty and listed as slow"""
+        pdf_path = make_pdf(["Page 1", "Page 2", "Page 3"])
+        with PDFDocument(str(pdf_path), page_timeout=0.05) as document, slow_pages(1):
+            extracted = document.extract_pages()
+        
+        assert [text and text.strip() for text in extracted.pages] == ["Page 1", None, "Page 3"]
+        assert [(page.index, page.aborted) for page in document.slow_pages] == [(1, True)]
+        assert "Page 2 exceeded its 0.05s extraction budget" in capsys.readouterr().out
+    
+    def test_document_timeout_skips_rest(self, make_pdf, tmp_path):
+        """Test the remaining pages are skipped once the document budget is spent, and nothing is cached"""
+        pdf_path = make_pdf([f"Page {i + 1}" for i in range(4)])
+        cache = ExtractionCache(str(tmp_path / "cache"))
+        with PDFDocument(str(pdf_path), cache=cache, document_timeout=0.1) as document, \
+                slow_pages(1, seconds=0.2):
+            extracted = document.extract_pages()
+        
+        assert extracted.pages[0].strip() == "Page 1"
+        assert extracted.pages[1:] == [None, None, None]
+        assert document.budget_skipped_pages == [2, 3]
+        assert document.budget_exceeded
+        assert not list((tmp_path / "cache").glob("*"))
+    
+    def test_measured_off_main_thread(self, make_pdf):
+        """Test pages decoded in a worker thread run to completion and are reported as slow"""
+        document = PDFDocument(str(make_pdf(["Page 1", "Page 2"])), page_timeout=0.05)
+        with slow_pages(0, seconds=0.1):
+            thread = threading.Thread(target=document.extract_pages)
+            thread.start()
+            thread.join()
+        
+        assert document.page_text(0).strip() == "Page 1"
+        assert [(page.index, page.aborted) for page in document.slow_pages] == [(0, False)]
+        document.close()
+    
+    def test_shard_budget(self, make_pdf):
+        """Test worker shards apply the page budget too"""
+        pdf_path = make_pdf(["Page 1", "Page 2"])
+        with slow_pages(0):
+            results = _extract_page_shard(str(pdf_path), [0, 1], budget=ExtractionBudget(page_timeout=0.05))
+        
+        assert results[0].value is None and results[0].slow.aborted
+        assert results[1].value.strip() == "Page 2"
+    
+    def test_rejects_non_positive_budget(self):
+        with pytest.raises(ValueError):
+            ExtractionBudget(page_timeout=0)
+    
+    def test_split_reports_slow_pages(self, make_pdf, tmp_path):
+        """Test a split carries on past a slow page and lists it in the run metrics"""
+        pdf_path = make_pdf(["Preface", "Chapter 1 Getting Started", "Body", "Chapter 2 Data Structures", "Body"])
+        expected = PDFChapterSplitter(str(pdf_path), str(tmp_path / "plain"), detection="text").split()
+        splitter = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"), detection="text", page_timeout=0.05)
+        with slow_pages(4):
+            output_files = splitter.split()
+        
+        assert len(output_files) == len(expected)
+        assert splitter.metrics.info["slow_pages"][0]["page"] == 5
+        assert splitter.metrics.info["slow_pages"][0]["aborted"]
+
+
+class TestExtractedText:
+    def test_page_breaks_match_text_lines(self):
+        """Test line offsets agree with the concatenated text"""
+        extracted = ExtractedText.from_pages(["a\nb", None, "c", "d\ne\nf"])
+        
+        assert extracted.page_breaks == [0, 2, 2, 3, 6]
+        assert extracted.text == "a\nb\nc\nd\ne\nf\n"
+        assert list(extracted.iter_lines()) == extracted.text.split('\n')[:-1]
+    
+    def test_single_extraction_pass(self, make_pdf, tmp_path):
+        """Test text and page breaks come from one decode of each page"""
+        pdf_path = make_pdf(["Page 1\nline", "Page 2", "Page 3"])
+        splitter = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"))
+        
+        with patch.object(PageObject, 'extract_text', autospec=True, return_value="x\ny") as mock_extract:
+            splitter.extract_text()
+            splitter.get_page_breaks()
+            splitter.find_chapter_pages([(0, "Chapter 1"), (3, "Chapter 2")])
+        
+        assert mock_extract.call_count == 3
+        splitter.document.close()
+
+
+class TestParallelExtraction:
+    def test_matches_sequential(self, make_pdf):
+        """Test process-pool extraction merges pages in order"""
+        pdf_path = make_pdf([f"Page {i + 1}\nline" for i in range(9)])
+        with PDFDocument(str(pdf_path)) as sequential, PDFDocument(str(pdf_path), jobs=3) as parallel:
+            assert parallel.extract_pages() == sequential.extract_pages()
+            # Main reader plus one reader per shard
+            assert parallel.open_count == 1 + 9
+    
+    def test_shard_records_bad_pages(self, make_pdf, capsys):
+        """Test a worker keeps going past an unreadable page"""
+        pdf_path = make_pdf(["Page 1", "Page 2"])
+        with patch.object(PageObject, 'extract_text', autospec=True,
+                          side_effect=[ValueError("broken"), "Page 2"]):
+            results = _extract_page_shard(str(pdf_path), [0, 1])
+        
+        assert (results[0].value, results[0].warning) == (None, "Warning: Error loading page 1: broken")
+        assert (results[1].value, results[1].warning) == ("Page 2", None)
+    
+    def test_resolve_jobs(self):
+        """Test zero jobs means one per CPU"""
+        assert resolve_jobs(4) == 4
+        assert resolve_jobs(0) >= 1
+        with pytest.raises(ValueError):
+            resolve_jobs(-1)
+
+
+class TestLinePageIndex:
+    @staticmethod
+    def linear_page_of_line(page_breaks, line_num):
+        """Reference implementation: the original linear scan"""
+        page = 0
+        for j, page_break in enumerate(page_breaks):
+            if line_num >= page_break:
+                page = j
+            else:
+                break
+        return page
+    
+    def test_matches_linear_scan(self):
+        """Test lookups agree with a linear scan, including empty pages"""
+        page_breaks = [0, 3, 3, 3, 7, 12, 12]
+        index = LinePageIndex(page_breaks)
+        lines = list(range(15))
+        
+        expected = [self.linear_page_of_line(page_breaks, n) for n in lines]
+        assert [index.page_of_line(n) for n in lines] == expected
+        assert index.pages_of_lines(lines) == expected
+        assert index.pages_of_lines(lines[::-1]) == expected[::-1]
+    
+    def test_page_queries(self):
+        index = LinePageIndex([0, 4, 10])
+        
+        assert index.page_count == 2
+        assert index.first_line_of_page(1) == 4
+        assert index.line_range(0) == (0, 4)
@@ -0,0 +1,74 @@
+import pytest
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+
+
+TITLES = ["Getting Started", "Data Structures", "Final Thoughts"]
+
+
+def book(page_count=12, chapter_pages=(2, 6, 9), heading_line=0):
+    """Body pages of 40 lines with a chapter heading on the given pages"""
+    pages = []
+    for page_num in range(page_count):
+        lines = [f"Body text line {i} on page {page_num + 1}" for i in range(40)]
+        if page_num in chapter_pages:
+            chapter_num = chapter_pages.index(page_num) + 1
+            lines[heading_line] = f"Chapter {chapter_num} {TITLES[chapter_num - 1]}"
+        pages.append("\n".join(lines))
+    return pages
+
+
+class TestHeaderDetection:
+    def test_header_lines_stop_below_band(self, make_pdf, tmp_path):
+        """Test only lines in the top band are returned, top to bottom"""
+        splitter = PDFChapterSplitter(str(make_pdf(book())), str(tmp_path / "out"))
+        
+        lines = splitter.document.header_lines(2, band=0.12)
+        assert [line.text for line in lines] == ["Chapter 1 Getting Started", "Body text line 1 on page 3"]
+        assert all(line.font_size == 12 for line in lines)
+    
+    def test_header_mode_split(self, make_pdf, tmp_path):
+        """Test chapters are split from header-band headings without full text"""
+        pdf_path = make_pdf(book())
+        splitter = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"), detection="header")
+        
+        output_files = splitter.split()
+        
+        assert splitter.detection_method == "header"
+        assert splitter.document.extracted_page_count == 0
+        assert [(r.start_page, r.end_page) for r in splitter.write_results] == [(0, 1), (2, 5), (6, 8), (9, 11)]
+        assert len(output_files) == 4
+    
+    def test_short_headings_in_band(self, make_pdf, tmp_path):
+        """Test a bare Chapter N line at the top of a page starts a chapter"""
+        pages = book()
+        for page_num, chapter_num in ((2, 1), (6, 2), (9, 3)):
+            pages[page_num] = pages[page_num].replace(f"Chapter {chapter_num} {TITLES[chapter_num - 1]}",
+                                                      f"Chapter {chapter_num}")
+        splitter = PDFChapterSplitter(str(make_pdf(pages)), str(tmp_path / "out"), detection="header")
+        
+        assert splitter.find_header_chapter_starts() == [(2, "Chapter 1"), (6, "Chapter 2"), (9, "Chapter 3")]
+    
+    def test_headings_below_band_are_ignored(self, make_pdf, tmp_path):
+        """Test a heading lower on the page is not seen by header detection"""
+        pdf_path = make_pdf(book(heading_line=30))
+        splitter = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"), detection="header")
+        
+        assert splitter.find_header_chapter_starts() == []
+        with pytest.raises(ValueError):
+            splitter.split()
+    
+    def test_rank_by_font_size(self, make_pdf, tmp_path):
+        """Test the largest occurrence of a heading wins when ranking by font size"""
+        pages = book(page_count=6, chapter_pages=(1, 4))
+        pages[0] = "Chapter 2 Data Structures\nChapter 1 Getting Started"
+        font_sizes = [9, 12, 12, 12, 12, 12]
+        pdf_path = make_pdf(pages, font_sizes=font_sizes)
+        
+        first = PDFChapterSplitter(str(pdf_path), str(tmp_path / "a"), detection="header")
+        ranked = PDFChapterSplitter(str(pdf_path), str(tmp_path / "b"), detection="header",
+                                    rank_by_font_size=True)
+        
+        assert [page for page, _ in first.find_header_chapter_starts()] == [0]
+        assert ranked.find_header_chapter_starts() == [
+            (1, "Chapter 1 Getting Started"), (4, "Chapter 2 Data Structures"),
+        ]
@@ -0,0 +1,66 @@
+from pdf_chapter_splitter.incremental import STATE_FILENAME, IncrementalState
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+from .conftest import add_outline
+from .pdf_builder import build_pdf
+
+
+BOOKMARKS = [("Intro", 1), ("Middle", 4), ("End", 6)]
+
+
+def edition(path, changed_page=None, page_count=8):
+    """Outlined book; changed_page gets revised text"""
+    pages = [f"Page {i + 1}" for i in range(page_count)]
+    if changed_page is not None:
+        pages[changed_page] += " (revised)"
+    build_pdf(path, pages)
+    return add_outline(path, [b for b in BOOKMARKS if b[1] < page_count])
+
+
+def split(pdf_path, output_dir):
+    splitter = PDFChapterSplitter(str(pdf_path), str(output_dir), incremental=True)
+    return splitter, splitter.split()
+
+
+class TestIncrementalSplit:
+    def test_rerun_is_noop(self, tmp_path):
+        """Test an unchanged book rewrites nothing on the second run"""
+        pdf_path = edition(tmp_path / "book.pdf")
+        output_dir = tmp_path / "out"
+        split(pdf_path, output_dir)
+        assert (output_dir / STATE_FILENAME).exists()
+        
+        splitter, output_files = split(pdf_path, output_dir)
+        
+        assert splitter.skipped_files == output_files
+        assert splitter.write_results == []
+    
+    def test_only_changed_chapter_is_rewritten(self, tmp_path):
+        """Test a revised page rewrites only the chapter containing it"""
+        output_dir = tmp_path / "out"
+        split(edition(tmp_path / "v1.pdf"), output_dir)
+        
+        splitter, output_files = split(edition(tmp_path / "v2.pdf", changed_page=5), output_dir)
+        
+        assert [r.path.name for r in splitter.write_results] == ["002.pdf"]
+        assert [p.name for p in splitter.skipped_files] == ["000.pdf", "001.pdf", "003.pdf"]
+        assert len(output_files) == 4
+    
+    def test_stale_outputs_removed(self, tmp_path):
+        """Test outputs of chapters that no longer exist are deleted"""
+        output_dir = tmp_path / "out"
+        split(edition(tmp_path / "v1.pdf"), output_dir)
+        
+        split(edition(tmp_path / "v2.pdf", page_count=6), output_dir)
+        
+        assert sorted(p.name for p in output_dir.glob("*.pdf")) == ["000.pdf", "001.pdf", "002.pdf"]
+        assert set(IncrementalState.load(output_dir).chapters) == {"000.pdf", "001.pdf", "002.pdf"}
+    
+    def test_full_split_discards_state(self, tmp_path):
+        """Test a regular split invalidates the incremental state"""
+        pdf_path = edition(tmp_path / "book.pdf")
+        output_dir = tmp_path / "out"
+        split(pdf_path, output_dir)
+        
+        PDFChapterSplitter(str(pdf_path), str(output_dir)).split()
+        
+        assert not (output_dir / STATE_FILENAME).exists()
@@ -0,0 +1,113 @@
+import pytest
+from pdf_chapter_splitter.matcher import HeadingMatcher, convert_number, kanji_to_int, roman_to_int
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+
+
+@pytest.mark.parametrize("num_str, expected", [
+    ("一", 1), ("十", 10), ("十二", 12), ("二十", 20), ("二十三", 23),
+    ("百", 100), ("百五", 105), ("千二百三十四", 1234), ("一二", 12), ("二〇", 20),
+    ("十十", None), ("二二十", None), ("A", None),
+])
+def test_kanji_to_int(num_str, expected):
+    assert kanji_to_int(num_str) == expected
+
+
+@pytest.mark.parametrize("num_str, expected", [
+    ("I", 1), ("iv", 4), ("IX", 9), ("XIV", 14), ("XL", 40), ("MCMXCIV", 1994),
+    ("IIII", None), ("VX", None), ("", None),
+])
+def test_roman_to_int(num_str, expected):
+    assert roman_to_int(num_str) == expected
+
+
+def test_convert_number_full_width():
+    assert convert_number("１２") == 12
+
+
+class TestHeadingMatcher:
+    @pytest.mark.parametrize("line, number, title, kind", [
+        ("第1章 はじめに", 1, "はじめに", "japanese"),
+        ("第十二章 応用編", 12, "応用編", "japanese"),
+        ("3章 データ分析", 3, "データ分析", "japanese"),
+        ("Chapter 2 Methods", 2, "Methods", "english"),
+        ("CHAPTER IV: Results", 4, "Results", "english"),
+        ("1. Introduction", 1, "Introduction", "numbered"),
+        ("2 Methods", 2, "Methods", "bare"),
+    ])
+    def test_formats(self, line, number, title, kind):
+        heading = HeadingMatcher().match(line)
+        assert (heading.number, heading.title, heading.kind) == (number, title, kind)
+    
+    @pytest.mark.parametrize("line", [
+        "1.1 Background", "Chapter Introduction", "2024 was a good year", "Plain text line",
+    ])
+    def test_non_headings(self, line):
+        assert HeadingMatcher().match(line) is None
+    
+    def test_chapter_range(self):
+        """Test numbers outside the configured range are rejected"""
+        assert HeadingMatcher().match("第二十章 終章") is None
+        assert HeadingMatcher((1, 30)).match("第二十章 終章").number == 20
+        with pytest.raises(ValueError):
+            HeadingMatcher((5, 1))
+    
+    def test_is_obviously_header(self):
+        assert HeadingMatcher.is_obviously_header("第1章 はじめに……… 12")
+        assert HeadingMatcher.is_obviously_header("Chapter 1 Introduction 15")
+        assert HeadingMatcher.is_obviously_header("3章")
+        assert not HeadingMatcher.is_obviously_header("Chapter 1 Introduction")
+
+
+def test_splitter_chapter_range():
+    """Test the splitter honours a custom chapter range"""
+    text = "Chapter 16 Appendix Material\nChapter 17 Glossary of Terms\n"
+    
+    assert PDFChapterSplitter("dummy.pdf").find_chapter_boundaries(text) == []
+    boundaries = PDFChapterSplitter("dummy.pdf", chapter_range=(1, 20)).find_chapter_boundaries(text)
+    assert [title for _, title in boundaries] == ["Chapter 16 Appendix Material", "Chapter 17 Glossary of Terms"]
+
+
+class TestHeadingRanking:
+    """Numbered lists and sentences must not displace explicit chapter headings"""
+    
+    TEXT = "\n".join([
+        "Chapter 1 Getting Started",
+        "2. Install the package with pip",
+        "3. Run the command line tool",
+        "Chapter 2 Data Structures and Types",
+        "Chapter 3 Final Thoughts and Outlook",
+        "5 apples were on the kitchen table",
+    ])
+    
+    def test_explicit_headings_win(self):
+        """Test list items between real headings are not taken as chapters"""
+        boundaries = PDFChapterSplitter("dummy.pdf").find_chapter_boundaries(self.TEXT)
+        
+        assert boundaries == [(0, "Chapter 1 Getting Started"), (3, "Chapter 2 Data Structures and Types"),
+                              (4, "Chapter 3 Final Thoughts and Outlook")]
+    
+    def test_weak_headings_without_explicit_ones(self):
+        """Test "N. Title" headings still split documents that have nothing better"""
+        text = "1. Introduction to the topic\nbody\n2. Methods we used here\n"
+        boundaries = PDFChapterSplitter("dummy.pdf").find_chapter_boundaries(text)
+        
+        assert [line for _, line in boundaries] == ["1. Introduction to the topic", "2. Methods we used here"]
+    
+    def test_streaming(self, tmp_path):
+        """Test streamed detection ignores weak matches once a real heading was read"""
+        splitter = PDFChapterSplitter(str(tmp_path / "book.pdf"))
+        pages = enumerate(self.TEXT.split("\n"))
+        
+        assert [title for _, _, title in splitter.iter_streamed_chapters(pages)] == [
+            "Chapter 1 Getting Started", "Chapter 2 Data Structures and Types",
+            "Chapter 3 Final Thoughts and Outlook",
+        ]
+    
+    def test_toc_verification(self, make_pdf):
+        """Test a numbered list item does not confirm a table of contents chapter"""
+        pdf_path = make_pdf(["Chapter 2 Data Structures", "3. Run the command line tool"])
+        splitter = PDFChapterSplitter(str(pdf_path))
+        
+        assert splitter._page_has_chapter(0, 2, "Data")
+        assert not splitter._page_has_chapter(1, 3, "Final Thoughts")
+        splitter.document.close()
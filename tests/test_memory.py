@@ -0,0 +1,65 @@
+import asyncio
+import io
+import pytest
+from pypdf import PdfReader
+from pdf_chapter_splitter import (PDFChapterSplitter, aiter_pdf_chapter_buffers, split_pdf_to_buffers,
+                                  split_pdf_to_buffers_async)
+from .conftest import add_outline
+
+
+def outlined_bytes(make_pdf):
+    pdf_path = make_pdf([f"Page {i + 1}" for i in range(8)])
+    return add_outline(pdf_path, [("Intro", 1), ("Middle", 4), ("End", 6)]).read_bytes()
+
+
+class TestInMemorySplit:
+    def test_split_bytes(self, make_pdf, tmp_path, monkeypatch):
+        """Test bytes in, chapter buffers out, nothing written to disk"""
+        data = outlined_bytes(make_pdf)
+        workdir = tmp_path / "cwd"
+        workdir.mkdir()
+        monkeypatch.chdir(workdir)
+        
+        chapters = split_pdf_to_buffers(data)
+        
+        assert [(c.filename, c.start_page, c.end_page, c.title) for c in chapters] == [
+            ("000.pdf", 0, 0, "Preface・Table of Contents"), ("001.pdf", 1, 3, "Intro"),
+            ("002.pdf", 4, 5, "Middle"), ("003.pdf", 6, 7, "End"),
+        ]
+        assert len(PdfReader(io.BytesIO(chapters[2].data)).pages) == 2
+        assert list(workdir.iterdir()) == []
+    
+    def test_stream_text_detection(self, make_pdf):
+        """Test a binary stream source with text detection"""
+        pdf_path = make_pdf(["Title page", "Chapter 1 Getting Started", "Body", "Chapter 2 Data Structures"])
+        with open(pdf_path, "rb") as stream:
+            splitter = PDFChapterSplitter(stream, detection="text")
+            chapters = list(splitter.iter_chapter_buffers())
+            assert not stream.closed
+        
+        assert splitter.detection_method == "text"
+        assert sum(c.page_count for c in chapters) == 4
+    
+    def test_file_output_needs_output_dir(self, make_pdf):
+        """Test an in-memory source cannot be split to files without output_dir"""
+        splitter = PDFChapterSplitter(outlined_bytes(make_pdf))
+        
+        with pytest.raises(ValueError, match="output_dir"):
+            splitter.split()
+
+
+class TestAsyncSplit:
+    def test_async_split(self, make_pdf):
+        """Test the async API matches the synchronous one"""
+        data = outlined_bytes(make_pdf)
+        
+        async def run():
+            chapters = await split_pdf_to_buffers_async(io.BytesIO(data))
+            streamed = [chapter async for chapter in aiter_pdf_chapter_buffers(data)]
+            return chapters, streamed
+        
+        chapters, streamed = asyncio.run(run())
+        assert [c.filename for c in chapters] == [c.filename for c in streamed] == [
+            "000.pdf", "001.pdf", "002.pdf", "003.pdf",
+        ]
+        assert [c.data for c in chapters] == [c.data for c in split_pdf_to_buffers(data)]
@@ -0,0 +1,81 @@
+import json
+from unittest.mock import patch
+from click.testing import CliRunner
+from pdf_chapter_splitter.cli import main
+from pdf_chapter_splitter.metrics import RunMetrics
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+
+
+BOOK = ["Preface", "Chapter 1 Introduction\nbody", "body", "Chapter 2 Methods and Materials\nbody"]
+
+
+class TestRunMetrics:
+    def test_stage_records_time_and_hook(self, tmp_path):
+        """Test stages are timed, passed to the hook and profiled"""
+        seen = []
+        metrics = RunMetrics(on_stage=seen.append, profile_dir=str(tmp_path / "prof"))
+        
+        with metrics.stage("extract", pages=10) as stage:
+            sum(range(10000))
+            stage.output_bytes = 5
+        
+        assert seen == metrics.stages
+        assert seen[0].name == "extract"
+        assert seen[0].wall_seconds > 0
+        assert seen[0].pages_per_second > 0
+        assert (tmp_path / "prof" / "00-extract.prof").exists()
+    
+    def test_stage_memory_is_per_stage(self):
+        """Test a stage reports the memory it added, not only the process high-water mark"""
+        metrics = RunMetrics()
+        with metrics.stage("small"):
+            pass
+        with metrics.stage("large"):
+            block = bytearray(64 * 2**20)
+            block[::4096] = b"x" * len(block[::4096])
+            del block
+        
+        small, large = metrics.stages
+        assert small.max_rss_growth_bytes < 2**20
+        assert large.max_rss_growth_bytes >= 32 * 2**20
+        assert large.max_rss_bytes >= large.rss_start_bytes + large.max_rss_growth_bytes // 2
+    
+    def test_stage_reports_workers_peak(self):
+        """Test worker memory is reported only by the stage whose workers raised it"""
+        metrics = RunMetrics()
+        with patch("pdf_chapter_splitter.metrics.workers_peak_rss_bytes", side_effect=[0, 300, 300, 300]):
+            with metrics.stage("extract"):
+                pass
+            with metrics.stage("detect"):
+                pass
+        
+        assert [stage.workers_max_rss_bytes for stage in metrics.stages] == [300, None]
+
+def test_split_reports_every_stage(make_pdf, tmp_path):
+    """Test a text-detected split records each pipeline stage"""
+    stages = []
+    splitter = PDFChapterSplitter(str(make_pdf(BOOK)), str(tmp_path / "out"), detection="text",
+                                  on_stage=lambda stage: stages.append(stage.name))
+    
+    output_files = splitter.split()
+    
+    assert stages[:4] == ["open", "extract", "detect:text", "page_mapping"]
+    assert [name for name in stages if name.startswith("write:")] == [f"write:{f.name}" for f in output_files]
+    assert stages[-1] == "write"
+    
+    data = splitter.metrics.to_dict()
+    assert data["page_count"] == 4
+    assert data["detection_method"] == "text"
+    assert data["output_bytes"] == sum(f.stat().st_size for f in output_files)
+
+
+def test_cli_metrics_json(make_pdf, tmp_path):
+    """Test --metrics-json writes machine-readable run metrics"""
+    metrics_path = tmp_path / "metrics.json"
+    result = CliRunner().invoke(main, [str(make_pdf(BOOK)), "-o", str(tmp_path / "out"), "--no-cache",
+                                       "--metrics-json", str(metrics_path)])
+    
+    assert result.exit_code == 0, result.output
+    data = json.loads(metrics_path.read_text())
+    assert data["output_files"] == len(list((tmp_path / "out").glob("*.pdf")))
+    assert {"name", "wall_seconds", "cpu_seconds", "max_rss_bytes", "pages_per_second"} <= set(data["stages"][0])
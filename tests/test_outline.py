@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import patch
+from pypdf import PageObject, PdfReader
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+from .conftest import add_outline
+
+
+@pytest.fixture
+def outlined_pdf(make_pdf):
+    """Six-page PDF with two front-matter pages and two outlined chapters"""
+    pdf_path = make_pdf([f"Page {i + 1}" for i in range(6)])
+    return add_outline(pdf_path, [("Chapter 1 Start", 2), ("Chapter 2 Next", 4)])
+
+
+class TestOutlineDetection:
+    def test_find_outline_chapters(self, outlined_pdf, tmp_path):
+        """Test bookmarks resolve to page indices"""
+        splitter = PDFChapterSplitter(str(outlined_pdf), str(tmp_path / "out"))
+        
+        assert splitter.find_outline_chapters() == [(2, "Chapter 1 Start"), (4, "Chapter 2 Next")]
+        splitter.document.close()
+    
+    def test_split_uses_outline_without_text_extraction(self, outlined_pdf, tmp_path):
+        """Test outline split never decodes page content"""
+        splitter = PDFChapterSplitter(str(outlined_pdf), str(tmp_path / "out"))
+        
+        with patch.object(PageObject, 'extract_text', side_effect=AssertionError("decoded")):
+            output_files = splitter.split()
+        
+        assert [f.name for f in output_files] == ["000.pdf", "001.pdf", "002.pdf"]
+        assert [len(PdfReader(f).pages) for f in output_files] == [2, 2, 2]
+    
+    def test_auto_falls_back_to_text(self, make_pdf, tmp_path):
+        """Test a PDF without outline goes through text detection"""
+        splitter = PDFChapterSplitter(str(make_pdf(["Page 1", "Page 2"])), str(tmp_path / "out"))
+        
+        with patch.object(splitter, 'find_chapter_boundaries', return_value=[]) as mock_find:
+            output_files = splitter.split()
+        
+        mock_find.assert_called_once()
+        assert len(output_files) == 1
+    
+    def test_outline_mode_requires_outline(self, make_pdf, tmp_path):
+        """Test forced outline detection fails without bookmarks"""
+        splitter = PDFChapterSplitter(str(make_pdf(["Page 1"])), str(tmp_path / "out"), detection="outline")
+        
+        with pytest.raises(ValueError):
+            splitter.split()
+    
+    def test_unknown_detection_mode(self, tmp_path):
+        """Test invalid detection mode is rejected"""
+        with pytest.raises(ValueError):
+            PDFChapterSplitter(str(tmp_path / "test.pdf"), detection="magic")
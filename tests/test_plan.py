@@ -0,0 +1,62 @@
+import json
+import pytest
+from click.testing import CliRunner
+from pdf_chapter_splitter.cli import main
+from pdf_chapter_splitter.plan import SplitPlan, materialize
+from pdf_chapter_splitter.splitter import PDFChapterSplitter, split_pdf_chapters
+from .conftest import add_outline
+
+
+@pytest.fixture
+def outlined_book(make_pdf):
+    pdf_path = make_pdf([f"Page {i + 1}" for i in range(8)])
+    return add_outline(pdf_path, [("Intro", 1), ("Middle", 4), ("End", 6)])
+
+
+class TestPlan:
+    def test_plan_writes_no_pdfs(self, outlined_book, tmp_path):
+        """Test plan mode returns and saves page ranges without writing PDFs"""
+        output_dir = tmp_path / "out"
+        plan = split_pdf_chapters(str(outlined_book), str(output_dir), plan_only=True)
+        
+        assert plan.detection_method == "outline"
+        assert [(c.index, c.start_page, c.end_page, c.title) for c in plan.chapters] == [
+            (0, 0, 0, "Preface・Table of Contents"), (1, 1, 3, "Intro"), (2, 4, 5, "Middle"), (3, 6, 7, "End"),
+        ]
+        assert all(c.confidence == 1.0 for c in plan.chapters)
+        assert [p.name for p in output_dir.iterdir()] == ["chapters.json"]
+        
+        manifest = json.loads((output_dir / "chapters.json").read_text(encoding="utf-8"))
+        assert manifest["chapters"][1]["filename"] == "001.pdf"
+        assert SplitPlan.load(output_dir / "chapters.json") == plan
+    
+    def test_text_plan_confidence(self, make_pdf, tmp_path):
+        """Test text-detected chapters get a lower confidence than outline ones"""
+        pdf_path = make_pdf(["Title page", "Chapter 1 Getting Started", "Body", "Chapter 2 Data Structures"])
+        plan = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"), detection="text").plan()
+        
+        assert plan.detection_method == "text"
+        assert {c.confidence for c in plan.chapters} == {0.6}
+    
+    def test_materialize_selected(self, outlined_book, tmp_path):
+        """Test a plan is turned into only the selected chapter files"""
+        plan = split_pdf_chapters(str(outlined_book), str(tmp_path / "plan"), plan_only=True)
+        
+        results = materialize(plan, tmp_path / "files", indices=[2, 3])
+        
+        assert [r.path.name for r in results] == ["002.pdf", "003.pdf"]
+        assert [(r.start_page, r.end_page) for r in results] == [(4, 5), (6, 7)]
+        with pytest.raises(ValueError):
+            materialize(plan, tmp_path / "files", indices=[9])
+    
+    def test_cli_plan_then_materialize(self, outlined_book, tmp_path):
+        """Test split --plan followed by the materialize command"""
+        output_dir = tmp_path / "out"
+        runner = CliRunner()
+        result = runner.invoke(main, [str(outlined_book), "-o", str(output_dir), "--plan", "--no-cache"])
+        assert result.exit_code == 0, result.output
+        assert not list(output_dir.glob("*.pdf"))
+        
+        result = runner.invoke(main, ["materialize", str(output_dir / "chapters.json"), "--chapters", "0,2-3"])
+        assert result.exit_code == 0, result.output
+        assert sorted(p.name for p in output_dir.glob("*.pdf")) == ["000.pdf", "002.pdf", "003.pdf"]
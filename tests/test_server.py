@@ -0,0 +1,234 @@
+import http.client
+import json
+import signal
+import socket
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from pdf_chapter_splitter.server import SplitJob, SplitService, is_loopback, make_server, parse_job, run_job
+from .conftest import add_outline
+
+
+def stubborn_job(job):
+    """Job that ignores SIGALRM and hangs when asked to, like a worker stuck in C code"""
+    if job.source == "hang":
+        signal.signal(signal.SIGALRM, signal.SIG_IGN)
+        time.sleep(60)
+    return {"status": "ok", "page_count": 1, "seconds": 0.0}
+
+
+@pytest.fixture
+def book(make_pdf):
+    pdf_path = make_pdf([f"Page {i + 1}" for i in range(6)])
+    return add_outline(pdf_path, [("Intro", 1), ("Body", 3)])
+
+
+@pytest.fixture
+def server():
+    """Split server with one warm worker on a free localhost port"""
+    service = SplitService(workers=1, queue_size=0, timeout=30)
+    service.warm_up()
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def request(server, method, path, body=None, content_type="application/json"):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=30)
+    connection.request(method, path, body, {"Content-Type": content_type})
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read()), response.getheader("Retry-After")
+    connection.close()
+    return result
+
+
+class TestRunJob:
+    def test_split_files(self, book, tmp_path):
+        """Test a path job writes the chapters and returns their paths"""
+        result = run_job(SplitJob(str(book), str(tmp_path / "out")))
+        
+        assert result["status"] == "ok"
+        assert result["page_count"] == 6
+        assert [path.rsplit("/", 1)[-1] for path in result["files"]] == ["000.pdf", "001.pdf", "002.pdf"]
+    
+    def test_plan_from_bytes(self, book):
+        """Test an uploaded PDF can be planned without writing anything"""
+        result = run_job(SplitJob(book.read_bytes(), plan_only=True))
+        
+        assert result["detection_method"] == "outline"
+        assert result["manifest"]["pdf_path"] is None
+        assert [c["start_page"] for c in result["manifest"]["chapters"]] == [0, 1, 3]
+    
+    def test_failures_and_timeouts(self, book, tmp_path):
+        """Test errors and time limits are reported instead of raised"""
+        failed = run_job(SplitJob(str(tmp_path / "missing.pdf"), str(tmp_path / "out")))
+        assert failed["status"] == "failed"
+        
+        with patch("pdf_chapter_splitter.server.PDFChapterSplitter.split", side_effect=lambda: time.sleep(2)):
+            timed_out = run_job(SplitJob(str(book), str(tmp_path / "out"), timeout=0.05))
+        assert timed_out["status"] == "timeout"
+
+
+class TestParseJob:
+    def test_json_job(self):
+        job = parse_job("application/json", json.dumps(
+            {"path": "book.pdf", "output_dir": "out", "options": {"chapter_range": [1, 40]}}).encode(), "")
+        assert (job.source, job.output_dir, job.plan_only) == ("book.pdf", "out", False)
+        assert job.options == {"chapter_range": (1, 40)}
+    
+    def test_pdf_body(self):
+        job = parse_job("application/pdf", b"%PDF-", "plan=true&detection=toc&timeout=5")
+        assert (job.source, job.plan_only, job.timeout, job.options) == (b"%PDF-", True, 5, {"detection": "toc"})
+    
+    @pytest.mark.parametrize("content_type, body, query", [
+        ("application/json", b"not json", ""),
+        ("application/json", b'{"output_dir": "out"}', ""),
+        ("application/json", b'{"path": "a.pdf", "options": {"jobs": 8}}', ""),
+        ("application/pdf", b"%PDF-", ""),
+        ("application/pdf", b"%PDF-", "plan=true&timeout=-1"),
+    ])
+    def test_rejects_bad_requests(self, content_type, body, query):
+        with pytest.raises(ValueError):
+            parse_job(content_type, body, query)
+
+
+class TestServer:
+    def test_split_and_stats(self, server, book, tmp_path):
+        """Test path and upload jobs over HTTP, then the stats they leave behind"""
+        status, body, _ = request(server, "POST", "/split",
+                                  json.dumps({"path": str(book), "output_dir": str(tmp_path / "out")}))
+        assert status == 200
+        assert len(body["files"]) == 3
+        
+        status, body, _ = request(server, "POST", "/split?plan=true", book.read_bytes(), "application/pdf")
+        assert status == 200
+        assert len(body["manifest"]["chapters"]) == 3
+        
+        status, body, _ = request(server, "POST", "/split", json.dumps({"path": str(tmp_path / "missing.pdf"),
+                                                                        "output_dir": str(tmp_path / "x")}))
+        assert status == 422
+        
+        status, stats, _ = request(server, "GET", "/stats")
+        assert status == 200
+        assert (stats["completed"], stats["failed"], stats["queued"], stats["running"]) == (2, 1, 0, 0)
+        assert stats["pages"] == 12
+        assert stats["pages_per_second"] > 0
+    
+    def test_backpressure(self, server, book):
+        """Test jobs beyond the queue limit are rejected with 503 and Retry-After"""
+        service = server.service
+        assert service._slots.acquire(blocking=False)
+        try:
+            status, body, retry_after = request(server, "POST", "/split?plan=true", book.read_bytes(),
+                                                "application/pdf")
+        finally:
+            service._slots.release()
+        
+        assert (status, body["status"], retry_after) == (503, "rejected", "1")
+        assert service.snapshot()["rejected"] == 1
+    
+    def test_queue_time_does_not_count(self):
+        """Test a job queued behind others for longer than its limit still finishes"""
+        def slow_job(job):
+            time.sleep(0.3)
+            return {"status": "ok", "page_count": 1, "seconds": 0.3}
+        
+        service = SplitService(workers=1, queue_size=2, timeout=0.4)
+        service._executor.shutdown()
+        service._executor = ThreadPoolExecutor(max_workers=1)
+        results = []
+        with patch("pdf_chapter_splitter.server.TIMEOUT_GRACE", 0), \
+                patch("pdf_chapter_splitter.server.run_job", slow_job):
+            threads = [threading.Thread(target=lambda: results.append(service.run(SplitJob("book.pdf", plan_only=True))))
+                       for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        service.close()
+        
+        assert [status for status, _ in results] == [200, 200, 200]
+    
+    def test_hung_worker_is_replaced(self):
+        """Test a job ignoring its time limit gets its pool killed so the slot frees up"""
+        service = SplitService(workers=1, queue_size=0, timeout=0.2)
+        try:
+            with patch("pdf_chapter_splitter.server.TIMEOUT_GRACE", 0), \
+                    patch("pdf_chapter_splitter.server.run_job", stubborn_job):
+                status, body = service.run(SplitJob("hang", plan_only=True))
+                assert (status, body["status"]) == (504, "timeout")
+                
+                status, body = service.run(SplitJob("book.pdf", plan_only=True))
+                assert (status, body["status"]) == (200, "ok")
+        finally:
+            service.close()
+        
+        stats = service.snapshot()
+        assert (stats["pool_restarts"], stats["timed_out"], stats["completed"]) == (1, 1, 1)
+        assert stats["queued"] + stats["running"] == 0
+    
+    def test_concurrent_restarts_replace_pool_once(self):
+        """Test threads finding the same broken pool only replace it once"""
+        service = SplitService(workers=1)
+        broken = service._executor
+        try:
+            threads = [threading.Thread(target=service._restart_pool, args=(broken,)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert service._executor is not broken
+            assert service.snapshot()["pool_restarts"] == 1
+        finally:
+            service.close()
+    
+    def test_bad_requests(self, server):
+        assert request(server, "POST", "/split", b"{}")[0] == 400
+        assert request(server, "GET", "/missing")[0] == 404
+
+
+def test_unix_socket(book, tmp_path):
+    """Test the server also answers on a Unix domain socket"""
+    socket_path = str(tmp_path / "splitter.sock")
+    service = SplitService(workers=1)
+    server = make_server(service, socket_path=socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(socket_path)
+        client.sendall(b"GET /stats HTTP/1.0\r\n\r\n")
+        response = b"".join(iter(lambda: client.recv(65536), b""))
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+    
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.0 200")
+    assert json.loads(body)["workers"] == 1
+
+
+def test_refuses_unsafe_addresses(tmp_path):
+    """Test non-loopback hosts are refused and a regular file is not taken over as the socket"""
+    assert is_loopback("127.0.0.1") and is_loopback("::1") and is_loopback("localhost")
+    assert not any(is_loopback(host) for host in ("0.0.0.0", "", "192.168.1.10", "example.com"))
+    
+    service = SplitService(workers=1)
+    precious = tmp_path / "notes.txt"
+    precious.write_text("keep me")
+    try:
+        with pytest.raises(ValueError, match="loopback"):
+            make_server(service, host="0.0.0.0", port=0)
+        with pytest.raises(ValueError, match="not a socket"):
+            make_server(service, socket_path=str(precious))
+    finally:
+        service.close()
+    
+    assert precious.read_text() == "keep me"
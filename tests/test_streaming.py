@@ -0,0 +1,49 @@
+from pypdf import PdfReader
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+
+
+BOOK = [
+    "Front matter and preface",
+    "Chapter 1 Introduction\nbody text",
+    "more body text",
+    "Chapter 2 Methods and Materials\nbody text",
+    "final page",
+]
+
+
+class TestStreamingSplit:
+    def test_split_streaming(self, make_pdf, tmp_path):
+        """Test chapters start on their heading pages"""
+        splitter = PDFChapterSplitter(str(make_pdf(BOOK)), str(tmp_path / "out"), detection="text", streaming=True)
+        
+        output_files = splitter.split()
+        
+        assert [f.name for f in output_files] == ["000.pdf", "001.pdf", "002.pdf"]
+        assert [len(PdfReader(f).pages) for f in output_files] == [1, 2, 2]
+        # Streaming does not keep page text around
+        assert splitter.document._page_texts == {}
+    
+    def test_chapters_emitted_before_end_of_document(self, tmp_path):
+        """Test a chapter is yielded as soon as the next heading is read"""
+        consumed = []
+        
+        def pages():
+            for page_num, page_text in enumerate(BOOK):
+                consumed.append(page_num)
+                yield page_num, page_text
+        
+        splitter = PDFChapterSplitter(str(tmp_path / "book.pdf"), str(tmp_path / "out"))
+        chapters = splitter.iter_streamed_chapters(pages())
+        
+        assert next(chapters) == (0, 0, "Preface・Table of Contents")
+        assert consumed == [0, 1]
+        assert next(chapters) == (1, 2, "Chapter 1 Introduction")
+        assert consumed == [0, 1, 2, 3]
+        assert list(chapters) == [(3, 4, "Chapter 2 Methods and Materials")]
+    
+    def test_heading_on_first_page(self, tmp_path):
+        """Test no empty preface is emitted when page 1 opens a chapter"""
+        splitter = PDFChapterSplitter(str(tmp_path / "book.pdf"), str(tmp_path / "out"))
+        pages = enumerate(["Chapter 1 Introduction", "text", None])
+        
+        assert list(splitter.iter_streamed_chapters(pages)) == [(0, 2, "Chapter 1 Introduction")]
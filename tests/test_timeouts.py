@@ -0,0 +1,48 @@
+import threading
+import time
+import pytest
+from pdf_chapter_splitter.timeouts import JobTimeout, alarm_available, time_limit
+
+
+def test_interrupts_slow_block():
+    """Test the block is interrupted once its time is up"""
+    started = time.perf_counter()
+    with pytest.raises(JobTimeout, match="too slow"):
+        with time_limit(0.05, "too slow"):
+            time.sleep(2)
+    assert time.perf_counter() - started < 1
+
+
+def test_no_limit():
+    """Test None and a finished block leave no timer behind"""
+    with time_limit(None):
+        time.sleep(0.01)
+    with time_limit(0.05):
+        pass
+    time.sleep(0.1)
+
+
+def test_nested_limits():
+    """Test an inner limit fires first, and the outer one still applies afterwards"""
+    with pytest.raises(JobTimeout, match="outer"):
+        with time_limit(0.2, "outer"):
+            with pytest.raises(JobTimeout, match="inner"):
+                with time_limit(0.05, "inner"):
+                    time.sleep(2)
+            time.sleep(2)
+
+
+def test_unlimited_off_main_thread():
+    """Test worker threads run unlimited instead of failing"""
+    outcome = []
+    
+    def work():
+        outcome.append(alarm_available())
+        with time_limit(0.01):
+            time.sleep(0.05)
+        outcome.append("done")
+    
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    assert outcome == [False, "done"]
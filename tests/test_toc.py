@@ -0,0 +1,59 @@
+import pytest
+from pdf_chapter_splitter.splitter import PDFChapterSplitter
+
+
+TOC = "\n".join([
+    "Contents",
+    "Chapter 1 Getting Started ........ 1",
+    "Chapter 2 Data Structures ........ 6",
+    "Chapter 3 Final Thoughts ........ 11",
+])
+
+
+def book(chapter_pages, page_count=60):
+    """Title page, TOC and preface followed by body pages with headings"""
+    pages = ["Title page", TOC, "Preface"] + ["Body text" for _ in range(page_count - 3)]
+    titles = {1: "Getting Started", 2: "Data Structures", 3: "Final Thoughts"}
+    for chapter_num, page_num in chapter_pages.items():
+        pages[page_num] = f"Chapter {chapter_num} {titles[chapter_num]}\nBody text"
+    return pages
+
+
+class TestTocDetection:
+    def test_find_toc_chapters(self):
+        """Test TOC lines parse to (chapter, title, printed page)"""
+        splitter = PDFChapterSplitter("dummy.pdf")
+        
+        assert splitter._find_toc_chapters(TOC.split("\n")) == [
+            (1, "Getting Started", 1), (2, "Data Structures", 6), (3, "Final Thoughts", 11),
+        ]
+    
+    def test_toc_guided_split_decodes_few_pages(self, make_pdf, tmp_path):
+        """Test chapters are located from the TOC with a page offset"""
+        # Printed page 1 is physical page 4; chapter 2 sits one page late
+        pdf_path = make_pdf(book({1: 3, 2: 9, 3: 13}))
+        splitter = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"), detection="toc")
+        
+        assert splitter.find_toc_chapter_starts() == [
+            (3, "Getting Started"), (9, "Data Structures"), (13, "Final Thoughts"),
+        ]
+        assert splitter.document.extracted_page_count < 25
+        
+        output_files = splitter.split()
+        assert len(output_files) == 4
+    
+    def test_falls_back_when_verification_fails(self, make_pdf, tmp_path):
+        """Test a chapter missing from its predicted page triggers a full scan"""
+        pdf_path = make_pdf(book({1: 3, 2: 20, 3: 13}))
+        splitter = PDFChapterSplitter(str(pdf_path), str(tmp_path / "out"))
+        
+        assert splitter.find_toc_chapter_starts() is None
+        splitter.split()
+        assert splitter.document.extracted_page_count == 60
+    
+    def test_toc_mode_requires_toc(self, make_pdf, tmp_path):
+        """Test forced TOC detection fails without a table of contents"""
+        splitter = PDFChapterSplitter(str(make_pdf(["Page 1"])), str(tmp_path / "out"), detection="toc")
+        
+        with pytest.raises(ValueError):
+            splitter.split()
@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DictionaryObject, NameObject
+from pdf_chapter_splitter.document import PDFDocument
+from pdf_chapter_splitter.writer import ChapterWriter, prune_resources
+
+
+@pytest.fixture
+def document(make_pdf):
+    pages = ["\n".join(f"Page {i + 1} line {n}" for n in range(20)) for i in range(8)]
+    with PDFDocument(str(make_pdf(pages))) as document:
+        yield document
+
+
+class TestChapterWriter:
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_write_all(self, document, tmp_path, workers):
+        """Test every chapter is written with its page range and size"""
+        chapter_pages = [(0, 1, "Front"), (2, 4, "Chapter 1"), (5, 7, "Chapter 2")]
+        writer = ChapterWriter(document.reader, tmp_path, workers=workers)
+        
+        results = writer.write_all(chapter_pages)
+        
+        assert [r.path.name for r in results] == ["000.pdf", "001.pdf", "002.pdf"]
+        assert [len(PdfReader(r.path).pages) for r in results] == [2, 3, 3]
+        assert all(r.bytes_written == r.path.stat().st_size for r in results)
+        assert all(r.seconds >= 0 for r in results)
+        assert document.open_count == 1
+    
+    def test_invalid_workers(self, document, tmp_path):
+        """Test worker count must be positive"""
+        with pytest.raises(ValueError):
+            ChapterWriter(document.reader, tmp_path, workers=0)
+    
+    def test_optimize_reports_saving(self, document, tmp_path):
+        """Test optimized chapters are smaller, readable and report their saving"""
+        (tmp_path / "plain").mkdir()
+        (tmp_path / "small").mkdir()
+        
+        before = ChapterWriter(document.reader, tmp_path / "plain").write_chapter(0, 7, "book.pdf")
+        after = ChapterWriter(document.reader, tmp_path / "small", optimize=True,
+                              measure_savings=True).write_chapter(0, 7, "book.pdf")
+        
+        assert after.bytes_written < before.bytes_written
+        assert after.bytes_saved == before.bytes_written - after.bytes_written
+        assert after.optimize_seconds > 0
+        assert PdfReader(after.path).pages[7].extract_text().startswith("Page 8 line 0")
+    
+    def test_optimize_skips_measuring_write(self, document, tmp_path):
+        """Test the unoptimized size is only measured on request"""
+        with patch.object(PdfWriter, "write", autospec=True, side_effect=PdfWriter.write) as write:
+            result = ChapterWriter(document.reader, tmp_path, optimize=True).write_chapter(0, 7, "book.pdf")
+        
+        assert write.call_count == 1
+        assert result.bytes_saved is None
+        assert result.optimize_seconds > 0
+
+
+def test_prune_resources(make_pdf):
+    """Test unused fonts are dropped without touching shared resources"""
+    writer = PdfWriter(clone_from=PdfReader(make_pdf(["Page 1", "Page 2"])))
+    page = writer.pages[0]
+    fonts = page["/Resources"]["/Font"]
+    fonts[NameObject("/Unused")] = DictionaryObject({NameObject("/Type"): NameObject("/Font")})
+    
+    assert prune_resources(page) == 1
+    assert set(page["/Resources"]["/Font"]) == {"/F1"}
+    assert "/Unused" in fonts